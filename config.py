@@ -5,6 +5,8 @@ import sys
 import platform
 from enum import Enum
 
+import numpy as np
+
 # Handle PyInstaller bundled resources
 if getattr(sys, 'frozen', False):
     # Running as compiled executable - use current working directory
@@ -235,6 +237,28 @@ class ColorSystem:
         
         return ColorSystem.RYBW  # Default fallback
 
+    @staticmethod
+    def preview_array(color_conf: dict) -> np.ndarray:
+        """
+        Get the preview colors of a color system as an ndarray
+        
+        Args:
+            color_conf: Color system configuration dict
+        
+        Returns:
+            (num_materials, 4) uint8 array, row i = color_conf['preview'][i]
+        
+        Note:
+            Built once and stored as color_conf['preview_arr'], so hot paths
+            can index ``arr[material_id]`` instead of the per-id dict lookup.
+        """
+        arr = color_conf.get('preview_arr')
+        if arr is None:
+            preview = color_conf['preview']
+            arr = np.array([preview[i] for i in range(len(preview))], dtype=np.uint8)
+            color_conf['preview_arr'] = arr
+        return arr
+
 # ========== Global Constants ==========
 
 # Extractor constants
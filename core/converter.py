@@ -4,7 +4,14 @@ Lumina Studio - Image Converter Coordinator (Refactored)
 Coordinates modules to complete image-to-3D model conversion.
 """
 
+import bisect
+import copy
+import functools
+import io
+import logging
+import math
 import os
+import tempfile
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import deque
@@ -23,8 +30,11 @@ from core.image_processing import LuminaImageProcessor
 from core.mesh_generators import get_mesher
 from core.geometry_utils import create_keychain_loop
 from core.heightmap_loader import HeightmapLoader
+from core.i18n import I18n
 from core.naming import generate_model_filename, generate_preview_filename
 
+logger = logging.getLogger(__name__)
+
 # Try to import SVG rendering libraries
 try:
     from svglib.svglib import svg2rlg
@@ -33,6 +43,22 @@ try:
 except ImportError:
     HAS_SVG_LIB = False
 
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    numba = None
+    HAS_NUMBA = False
+
+# Voxel matrices hold material ids (0..N) and small negative markers
+# (-1 air, -2 separate backing, -3 wire); int8 keeps them 1 byte per voxel
+# for the per-layer `== mat_id` scans in the meshers
+_VOXEL_DTYPE = np.int8
+
+# Background writer for 3MF exports: the zip write overlaps the preview
+# build in convert_image_to_3d (threads start on first use)
+_EXPORT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lumina-export")
+
 # Import palette HTML generator from extension (non-invasive)
 # Moved to lazy import to avoid circular dependency
 # from ui.palette_extension import generate_palette_html, generate_lut_color_grid_html
@@ -226,6 +252,12 @@ def _rgb_to_hex(rgb):
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+def _rgb_to_hex_list(rgb):
+    """将 (N, 3) RGB 数组批量转换为 #rrggbb 列表（一次 bytes.hex）。"""
+    flat = np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 3).tobytes().hex()
+    return ['#' + flat[i:i + 6] for i in range(0, len(flat), 6)]
+
+
 def _hex_to_rgb_tuple(hex_color):
     """将 #RRGGBB 转换为 (R, G, B)。"""
     if not isinstance(hex_color, str):
@@ -240,6 +272,80 @@ def _hex_to_rgb_tuple(hex_color):
     return (int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16))
 
 
+def _build_preview_rgba(matched_rgb, mask_solid):
+    """Opaque matched colors on solid pixels, fully transparent elsewhere.
+
+    Fills RGB + alpha densely and zeroes non-solid pixels with one streaming
+    multiply, instead of two boolean gathers/scatters over ``mask_solid``.
+    """
+    h, w = mask_solid.shape
+    preview_rgba = np.empty((h, w, 4), dtype=np.uint8)
+    preview_rgba[..., :3] = matched_rgb
+    preview_rgba[..., 3] = 255
+    np.multiply(preview_rgba, mask_solid[..., None], out=preview_rgba)
+    return preview_rgba
+
+
+def _pack_rgb(rgb):
+    """Pack an (H, W, 3) RGB array into (H, W) uint32 keys ``R | G<<8 | B<<16``."""
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return rgb[..., 0] | (rgb[..., 1] << 8) | (rgb[..., 2] << 16)
+
+
+@functools.lru_cache(maxsize=256)
+def _hex_to_packed_key(hex_color):
+    """Parse ``#rrggbb`` into the packed key used by ``_pack_rgb``.
+
+    Memoized: repeated clicks on the same palette color skip re-parsing.
+    Raises ValueError for malformed input (exceptions are not cached).
+    """
+    r = int(hex_color[1:3], 16)
+    g = int(hex_color[3:5], 16)
+    b = int(hex_color[5:7], 16)
+    return r | (g << 8) | (b << 16)
+
+
+def _get_matched_packed(cache):
+    """Return packed matched_rgb from cache, building it on first use.
+
+    Built lazily (only highlighting needs it) and stored together with the
+    matched_rgb it came from, so callers that replace ``cache['matched_rgb']``
+    never see a stale key map.
+    """
+    matched_rgb = cache['matched_rgb']
+    entry = cache.get('matched_packed')
+    if entry is None or entry[0] is not matched_rgb:
+        entry = (matched_rgb, _pack_rgb(matched_rgb))
+        cache['matched_packed'] = entry
+    return entry[1]
+
+
+def _replacements_signature(original_rgb, replacement_regions, merge_map):
+    """Identity signature of the inputs that produce a replaced matched_rgb.
+
+    Region masks are compared by identity (UI callbacks always store a fresh
+    copy), merge maps and replacement colors by value.
+    """
+    merge_sig = frozenset(merge_map.items()) if merge_map else None
+    regions_sig = tuple(
+        (item.get('mask'), item.get('replacement'))
+        for item in (replacement_regions or [])
+    )
+    return original_rgb, merge_sig, regions_sig
+
+
+def _same_replacements_signature(a, b):
+    """Compare two ``_replacements_signature`` results."""
+    if a is None or b is None:
+        return False
+    if a[0] is not b[0] or a[1] != b[1] or len(a[2]) != len(b[2]):
+        return False
+    return all(
+        mask_a is mask_b and hex_a == hex_b
+        for (mask_a, hex_a), (mask_b, hex_b) in zip(a[2], b[2])
+    )
+
+
 def _build_selection_meta(q_rgb, m_rgb, scope="region"):
     """构建点击选区元数据（量化色 + 原配准色）。"""
     return {
@@ -429,18 +535,27 @@ def _save_debug_preview(debug_data, material_matrix, mask_solid, image_path, mod
     try:
         contour_overlay = debug_img.copy()
         
+        # (H, W, num_materials): material present in any layer of a solid
+        # pixel, from one comparison pass over material_matrix
+        mat_present = np.any(
+            material_matrix[..., np.newaxis] == np.arange(num_materials), axis=2
+        )
+        mat_present &= mask_solid[..., np.newaxis]
+        
         for mat_id in range(num_materials):
-            mat_mask = np.zeros(material_matrix.shape[:2], dtype=np.uint8)
-            for layer in range(material_matrix.shape[2]):
-                mat_mask = np.logical_or(mat_mask, material_matrix[:, :, layer] == mat_id)
-            
-            mat_mask = np.logical_and(mat_mask, mask_solid).astype(np.uint8) * 255
-            
-            if not np.any(mat_mask):
+            present = mat_present[..., mat_id]
+            rows = np.flatnonzero(present.any(axis=1))
+            if len(rows) == 0:
                 continue
+            cols = np.flatnonzero(present.any(axis=0))
+            y0, y1 = int(rows[0]), int(rows[-1]) + 1
+            x0, x1 = int(cols[0]), int(cols[-1]) + 1
             
+            # Trace only the material's bounding box; offset maps the
+            # contours back to full-image coordinates
+            mat_mask = present[y0:y1, x0:x1].astype(np.uint8) * 255
             contours, _ = cv2.findContours(
-                mat_mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE
+                mat_mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0)
             )
             
             cv2.drawContours(contour_overlay, contours, -1, (0, 0, 0), 1)
@@ -461,6 +576,30 @@ def _save_debug_preview(debug_data, material_matrix, mask_solid, image_path, mod
     print(f"[DEBUG_PREVIEW] This is the EXACT image the vectorizer sees before meshing")
 
 
+# ========== LUT Processor Cache ==========
+
+@functools.lru_cache(maxsize=4)
+def _load_processor(lut_path, mtime_ns, size, color_mode):
+    return LuminaImageProcessor(lut_path, color_mode)
+
+
+def _get_processor(lut_path, color_mode):
+    """
+    Get a LuminaImageProcessor with the LUT already loaded.
+    
+    Loading parses the LUT and builds its KDTree, so processors are memoized
+    by (path, mtime, size, color_mode); preview -> generate on the same LUT
+    loads it once, rewriting the file invalidates it. Callers get a shallow
+    copy, so per-call flags (enable_cleanup) never leak between requests
+    while the LUT arrays and KDTree stay shared (read-only).
+    """
+    try:
+        st = os.stat(lut_path)
+    except (OSError, TypeError, ValueError):
+        return LuminaImageProcessor(lut_path, color_mode)
+    return copy.copy(_load_processor(lut_path, st.st_mtime_ns, st.st_size, color_mode))
+
+
 # ========== Main Conversion Function ==========
 
 def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
@@ -468,7 +607,7 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
                          add_loop, loop_width, loop_length, loop_hole, loop_pos,
                          modeling_mode=ModelingMode.VECTOR, quantize_colors=32,
                          blur_kernel=0, smooth_sigma=10,
-                         color_replacements=None, replacement_regions=None, backing_color_id=0, separate_backing=False,
+                         color_replacements=None, replacement_regions=None, backing_color_id=0, separate_backing: bool = False,
                          enable_relief=False, color_height_map=None,
                          height_mode: str = "color",
                          heightmap_path=None, heightmap_max_height=None,
@@ -535,12 +674,9 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
         return None, None, None, "[ERROR] Invalid LUT file format", None
     
     # Handle backing separation: override backing_color_id if separate_backing is True
-    # Error handling for checkbox state (Requirement 8.4)
-    try:
-        separate_backing = bool(separate_backing) if separate_backing is not None else False
-    except Exception as e:
-        print(f"[CONVERTER] Error reading separate_backing checkbox state: {e}, using default (False)")
-        separate_backing = False
+    # Checkbox state guard (Requirement 8.4): anything but a real True
+    # (None, missing state) means "not separated"; an `is` test never raises
+    separate_backing = separate_backing is True
     
     if separate_backing:
         backing_color_id = -2
@@ -805,7 +941,7 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
     _hifi_t0 = time.perf_counter()
     
     try:
-        processor = LuminaImageProcessor(actual_lut_path, color_mode)
+        processor = _get_processor(actual_lut_path, color_mode)
         processor.enable_cleanup = enable_cleanup
         result = processor.process_image(
             image_path=image_path,
@@ -899,9 +1035,7 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
             print(f"[CONVERTER] Warning: Failed to save debug preview: {e}")
     
     # Step 3: Generate Preview Image
-    preview_rgba = np.zeros((target_h, target_w, 4), dtype=np.uint8)
-    preview_rgba[mask_solid, :3] = matched_rgb[mask_solid]
-    preview_rgba[mask_solid, 3] = 255
+    preview_rgba = _build_preview_rgba(matched_rgb, mask_solid)
     
     # Step 4: Handle Keychain Loop
     loop_info = None
@@ -1198,6 +1332,7 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
     
     # Step 7: Add Keychain Loop
     loop_added = False
+    preview_loop = None
     
     if add_loop and loop_info is not None:
         try:
@@ -1212,6 +1347,9 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
             )
             
             if loop_mesh is not None:
+                # Untouched copy for the 3D preview (Step 9): scene geometry
+                # is flipped/mirrored in place before the 3MF export
+                preview_loop = loop_mesh.copy()
                 loop_mesh.visual.face_colors = preview_colors[loop_info['color_id']]
                 loop_mesh.metadata['name'] = "Keychain_Loop"
                 scene.add_geometry(
@@ -1245,9 +1383,8 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
                 coating_mask = (dilated_mask > 0)
 
             # Build a small voxel matrix for the coating: coating_layers × H × W
-            coating_matrix = np.full((coating_layers, target_h, target_w), -1, dtype=int)
-            coating_slice = np.where(coating_mask, 0, -1).astype(int)
-            coating_matrix[:] = coating_slice[np.newaxis, :, :]
+            coating_matrix = np.full((coating_layers, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
+            coating_matrix[:, coating_mask] = 0
 
             coating_mesh = mesher.generate_mesh(coating_matrix, 0, target_h)
             if coating_mesh and len(coating_mesh.vertices) > 0:
@@ -1390,7 +1527,7 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
         'brim_type': 'auto_brim',
     }
     
-    try:
+    def _export_3mf():
         print(f"[CONVERTER] Exporting with BambuStudio metadata...")
         export_scene_with_bambu_metadata(
             scene=scene,
@@ -1400,98 +1537,102 @@ def convert_image_to_3d(image_path, lut_path, target_width_mm, spacer_thick,
             settings=print_settings,
             color_mode=color_mode
         )
-        _hifi_timings['export_3mf_s'] = time.perf_counter() - _export_t0
         print(f"[CONVERTER] 3MF exported with embedded settings: {out_path}")
-    except Exception as e:
-        print(f"[CONVERTER] Error exporting 3MF: {e}")
-        return None, None, None, f"[ERROR] 3MF export failed: {e}", None
+        return time.perf_counter() - _export_t0
     
-    # Step 8.5: Generate Color Recipe Report
-    color_recipe_path = None
-    recipe_policy = os.getenv("LUMINA_COLOR_RECIPE_POLICY", "auto").strip().lower()
+    # The scene is final here; write it in the background while the recipe
+    # report and 3D preview are built, and join before reporting (Step 10)
+    export_future = _EXPORT_EXECUTOR.submit(_export_3mf)
+    
+    # Join the writer even when Steps 8.5-9 raise, so a failed export is
+    # reported and no orphaned writer races a retry on the same file
+    export_error = None
     try:
-        recipe_auto_max_pixels = int(os.getenv("LUMINA_COLOR_RECIPE_AUTO_MAX_PIXELS", "1200000"))
-    except Exception:
-        recipe_auto_max_pixels = 1200000
-    solid_pixels = int(np.count_nonzero(mask_solid))
-    enable_recipe = recipe_policy == "on" or (
-        recipe_policy == "auto" and solid_pixels <= recipe_auto_max_pixels
-    )
-    if enable_recipe:
+        # Step 8.5: Generate Color Recipe Report
+        color_recipe_path = None
+        recipe_policy = os.getenv("LUMINA_COLOR_RECIPE_POLICY", "auto").strip().lower()
         try:
-            from utils.color_recipe_logger import ColorRecipeLogger
-
-            model_filename = os.path.basename(out_path)
-            color_recipe_path = ColorRecipeLogger.create_from_processor(
-                processor=processor,
-                output_dir=OUTPUT_DIR,
-                model_filename=model_filename,
-                matched_rgb=matched_rgb,
-                material_matrix=material_matrix,
-                mask_solid=mask_solid
-            )
-        except Exception as e:
-            print(f"[CONVERTER] Warning: Failed to generate color recipe report: {e}")
-    else:
-        print(
-            f"[CONVERTER] Skipping color recipe report: policy={recipe_policy}, "
-            f"solid_pixels={solid_pixels}, auto_max={recipe_auto_max_pixels}"
+            recipe_auto_max_pixels = int(os.getenv("LUMINA_COLOR_RECIPE_AUTO_MAX_PIXELS", "1200000"))
+        except Exception:
+            recipe_auto_max_pixels = 1200000
+        solid_pixels = int(np.count_nonzero(mask_solid))
+        enable_recipe = recipe_policy == "on" or (
+            recipe_policy == "auto" and solid_pixels <= recipe_auto_max_pixels
         )
+        if enable_recipe:
+            try:
+                from utils.color_recipe_logger import ColorRecipeLogger
+
+                model_filename = os.path.basename(out_path)
+                color_recipe_path = ColorRecipeLogger.create_from_processor(
+                    processor=processor,
+                    output_dir=OUTPUT_DIR,
+                    model_filename=model_filename,
+                    matched_rgb=matched_rgb,
+                    material_matrix=material_matrix,
+                    mask_solid=mask_solid
+                )
+            except Exception as e:
+                print(f"[CONVERTER] Warning: Failed to generate color recipe report: {e}")
+        else:
+            print(
+                f"[CONVERTER] Skipping color recipe report: policy={recipe_policy}, "
+                f"solid_pixels={solid_pixels}, auto_max={recipe_auto_max_pixels}"
+            )
     
-    # Step 9: Generate 3D Preview
-    _prog(0.90, "生成 3D 预览中... | Generating 3D preview...")
-    preview_mesh = _create_preview_mesh(
-        matched_rgb, mask_solid, total_layers,
-        backing_color_id=backing_color_id,
-        backing_z_range=backing_metadata['backing_z_range'],
-        preview_colors=preview_colors
-    )
+        # Step 9: Generate 3D Preview
+        _prog(0.90, "生成 3D 预览中... | Generating 3D preview...")
+        preview_mesh = _create_preview_mesh(
+            matched_rgb, mask_solid, total_layers,
+            backing_color_id=backing_color_id,
+            backing_z_range=backing_metadata['backing_z_range'],
+            preview_colors=preview_colors
+        )
 
-    if preview_mesh:
-        preview_mesh.apply_transform(transform)
+        if preview_mesh:
+            preview_mesh.apply_transform(transform)
         
-        if loop_added and loop_info:
-            try:
-                preview_loop = create_keychain_loop(
-                    width_mm=loop_info['width_mm'],
-                    length_mm=loop_info['length_mm'],
-                    hole_dia_mm=loop_info['hole_dia_mm'],
-                    thickness_mm=loop_thickness,
-                    attach_x_mm=loop_info['attach_x_mm'],
-                    attach_y_mm=loop_info['attach_y_mm']
-                )
-                if preview_loop:
-                    loop_color = preview_colors[loop_info['color_id']]
-                    preview_loop.visual.face_colors = [loop_color] * len(preview_loop.faces)
+            if loop_added and preview_loop is not None:
+                try:
+                    loop_color = np.asarray(preview_colors[loop_info['color_id']], dtype=np.uint8)
+                    preview_loop.visual.face_colors = np.tile(loop_color, (len(preview_loop.faces), 1))
                     preview_mesh = trimesh.util.concatenate([preview_mesh, preview_loop])
-            except Exception as e:
-                print(f"[CONVERTER] Preview loop failed: {e}")
+                except Exception as e:
+                    print(f"[CONVERTER] Preview loop failed: {e}")
         
-        # Add outline to preview
-        if outline_added:
-            try:
-                outline_thickness_mm = total_layers * PrinterConfig.LAYER_HEIGHT
-                preview_outline = _generate_outline_mesh(
-                    mask_solid=mask_solid,
-                    pixel_scale=pixel_scale,
-                    outline_width_mm=outline_width,
-                    outline_thickness_mm=outline_thickness_mm,
-                    target_h=target_h
-                )
-                if preview_outline:
-                    outline_color = preview_colors[0]  # White
-                    preview_outline.visual.face_colors = [outline_color] * len(preview_outline.faces)
-                    preview_mesh = trimesh.util.concatenate([preview_mesh, preview_outline])
-            except Exception as e:
-                print(f"[CONVERTER] Preview outline failed: {e}")
+            # Add outline to preview
+            if outline_added:
+                try:
+                    outline_thickness_mm = total_layers * PrinterConfig.LAYER_HEIGHT
+                    preview_outline = _generate_outline_mesh(
+                        mask_solid=mask_solid,
+                        pixel_scale=pixel_scale,
+                        outline_width_mm=outline_width,
+                        outline_thickness_mm=outline_thickness_mm,
+                        target_h=target_h
+                    )
+                    if preview_outline:
+                        outline_color = np.asarray(preview_colors[0], dtype=np.uint8)  # White
+                        preview_outline.visual.face_colors = np.tile(outline_color, (len(preview_outline.faces), 1))
+                        preview_mesh = trimesh.util.concatenate([preview_mesh, preview_outline])
+                except Exception as e:
+                    print(f"[CONVERTER] Preview outline failed: {e}")
     
-    if preview_mesh:
-        glb_path = os.path.join(OUTPUT_DIR, generate_preview_filename(base_name))
+        if preview_mesh:
+            glb_path = os.path.join(OUTPUT_DIR, generate_preview_filename(base_name))
 
-        # Export model-only GLB (bed platform is rendered by frontend)
-        preview_mesh.export(glb_path)
-    else:
-        glb_path = None
+            # Export model-only GLB (bed platform is rendered by frontend)
+            preview_mesh.export(glb_path)
+        else:
+            glb_path = None
+    finally:
+        try:
+            _hifi_timings['export_3mf_s'] = export_future.result()
+        except Exception as e:
+            print(f"[CONVERTER] Error exporting 3MF: {e}")
+            export_error = e
+    if export_error is not None:
+        return None, None, None, f"[ERROR] 3MF export failed: {export_error}", None
     
     # Step 10: Generate Status Message
     Stats.increment("conversions")
@@ -1705,6 +1846,8 @@ def _calculate_loop_info(loop_pos, loop_width, loop_length, loop_hole,
     
     attach_col = max(0, min(target_w - 1, attach_col))
     
+    # Most frequent non-zero material around the attach point (ties -> lowest
+    # id); bincount over the ~35 ids instead of unique + argsort
     loop_color_id = 0
     search_area = material_matrix[
         max(0, top_row-2):top_row+3,
@@ -1712,11 +1855,10 @@ def _calculate_loop_info(loop_pos, loop_width, loop_length, loop_hole,
     ]
     search_area = search_area[search_area >= 0]
     if len(search_area) > 0:
-        unique, counts = np.unique(search_area, return_counts=True)
-        for mat_id in unique[np.argsort(-counts)]:
-            if mat_id != 0:
-                loop_color_id = int(mat_id)
-                break
+        counts = np.bincount(search_area.ravel())
+        counts[0] = 0
+        if counts.any():
+            loop_color_id = int(counts.argmax())
     
     return {
         'attach_x_mm': attach_col * pixel_scale,
@@ -1728,11 +1870,34 @@ def _calculate_loop_info(loop_pos, loop_width, loop_length, loop_hole,
     }
 
 
+@functools.lru_cache(maxsize=32)
+def _ellipse_mask(r):
+    """(2r+1, 2r+1) bool mask of PIL's filled ellipse [0, 0, 2r, 2r]."""
+    size = 2 * r + 1
+    mask = Image.new('1', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse([0, 0, size - 1, size - 1], fill=1)
+    return np.array(mask)
+
+
+def _fill_clipped(arr, top, left, mask, value):
+    """Write value into arr where mask (placed at top/left) lands inside arr."""
+    h, w = arr.shape[:2]
+    mh, mw = mask.shape
+    y0, x0 = max(top, 0), max(left, 0)
+    y1, x1 = min(top + mh, h), min(left + mw, w)
+    if y0 >= y1 or x0 >= x1:
+        return
+    arr[y0:y1, x0:x1][mask[y0 - top:y1 - top, x0 - left:x1 - left]] = value
+
+
 def _draw_loop_on_preview(preview_rgba, loop_info, color_conf, pixel_scale):
-    """Draw keychain loop on preview image."""
-    preview_pil = Image.fromarray(preview_rgba, mode='RGBA')
-    draw = ImageDraw.Draw(preview_pil)
-    
+    """Draw keychain loop on preview image.
+
+    Paints straight into ``preview_rgba`` (and returns it): the rectangle is
+    a clipped slice write and the disks use PIL's own ellipse rasterization
+    of a (2r+1)^2 mask, so output matches ImageDraw without the full-image
+    PIL round trip.
+    """
     loop_color_rgba = tuple(color_conf['preview'][loop_info['color_id']][:3]) + (255,)
     
     attach_col = int(loop_info['attach_x_mm'] / pixel_scale)
@@ -1755,24 +1920,24 @@ def _draw_loop_on_preview(preview_rgba, loop_info, color_conf, pixel_scale):
     circle_center_x = attach_col
     
     if rect_h_px > 0:
-        draw.rectangle(
-            [loop_left, rect_top, loop_right, rect_bottom], 
-            fill=loop_color_rgba
+        # Inclusive corners, as ImageDraw.rectangle
+        _fill_clipped(
+            preview_rgba, rect_top, loop_left,
+            np.ones((rect_bottom - rect_top + 1, loop_right - loop_left + 1), dtype=np.bool_),
+            loop_color_rgba
         )
     
-    draw.ellipse(
-        [circle_center_x - circle_r_px, circle_center_y - circle_r_px,
-         circle_center_x + circle_r_px, circle_center_y + circle_r_px],
-        fill=loop_color_rgba
+    _fill_clipped(
+        preview_rgba, circle_center_y - circle_r_px, circle_center_x - circle_r_px,
+        _ellipse_mask(circle_r_px), loop_color_rgba
     )
     
-    draw.ellipse(
-        [circle_center_x - hole_r_px, circle_center_y - hole_r_px,
-         circle_center_x + hole_r_px, circle_center_y + hole_r_px],
-        fill=(0, 0, 0, 0)
+    _fill_clipped(
+        preview_rgba, circle_center_y - hole_r_px, circle_center_x - hole_r_px,
+        _ellipse_mask(hole_r_px), (0, 0, 0, 0)
     )
     
-    return np.array(preview_pil)
+    return preview_rgba
 
 
 def calculate_luminance(hex_color):
@@ -1935,16 +2100,19 @@ def _build_relief_voxel_matrix(matched_rgb, material_matrix, mask_solid, color_h
         # Clamp: pixel height < optical thickness → set to optical thickness
         pixel_heights[mask_solid & (pixel_heights < OPTICAL_THICKNESS_MM)] = OPTICAL_THICKNESS_MM
     else:
-        # Color height map mode: assign heights by color
+        # Color height map mode: assign heights by color, looked up once per
+        # unique solid color and scattered back through the inverse index
         pixel_heights = np.full((target_h, target_w), default_height, dtype=np.float32)
-        for y in range(target_h):
-            for x in range(target_w):
-                if not mask_solid[y, x]:
-                    continue
-                r, g, b = matched_rgb[y, x]
-                hex_color = f'#{r:02x}{g:02x}{b:02x}'
-                if hex_color in color_height_map:
-                    pixel_heights[y, x] = color_height_map[hex_color]
+        if np.any(mask_solid):
+            solid_rgb = matched_rgb[mask_solid]
+            _, first_idx, inverse = np.unique(
+                _pack_rgb(solid_rgb), return_index=True, return_inverse=True
+            )
+            color_heights = np.array(
+                [color_height_map.get(h, default_height) for h in _rgb_to_hex_list(solid_rgb[first_idx])],
+                dtype=np.float32
+            )
+            pixel_heights[mask_solid] = color_heights[inverse.reshape(-1)]
     
     # Step 2: Calculate max height to determine total Z layers
     max_height_mm = np.max(pixel_heights[mask_solid]) if np.any(mask_solid) else default_height
@@ -1955,47 +2123,30 @@ def _build_relief_voxel_matrix(matched_rgb, material_matrix, mask_solid, color_h
         print(f"[RELIEF] Height range: {np.min(pixel_heights[mask_solid]):.2f}mm - {max_height_mm:.2f}mm")
     
     # Step 3: Initialize voxel matrix
-    full_matrix = np.full((max_z_layers, target_h, target_w), -1, dtype=int)
+    full_matrix = np.full((max_z_layers, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
     
-    # Step 4: Fill voxel matrix
-    if height_matrix is not None:
-        # Vectorized fill for heightmap mode (much faster for large images)
-        target_z_layers = np.ceil(pixel_heights / PrinterConfig.LAYER_HEIGHT).astype(int)
-        target_z_layers = np.clip(target_z_layers, OPTICAL_LAYERS, max_z_layers)
-        optical_start_z = target_z_layers - OPTICAL_LAYERS
-        
-        # Fill backing layers
-        for z in range(max_z_layers):
-            backing_mask = mask_solid & (z < optical_start_z)
-            full_matrix[z][backing_mask] = backing_color_id
-        
-        # Fill optical layers
-        solid_ys, solid_xs = np.where(mask_solid)
-        for layer_idx in range(OPTICAL_LAYERS):
-            z_positions = optical_start_z + layer_idx
-            for i in range(len(solid_ys)):
-                y, x = solid_ys[i], solid_xs[i]
-                z = z_positions[y, x]
-                if z < max_z_layers:
-                    mat_id = material_matrix[y, x, OPTICAL_LAYERS - 1 - layer_idx]
-                    full_matrix[z, y, x] = mat_id
-    else:
-        # Original per-pixel loop for color height map mode
-        for y in range(target_h):
-            for x in range(target_w):
-                if not mask_solid[y, x]:
-                    continue
-                target_height_mm = max(0.08, pixel_heights[y, x])
-                target_z_layers_px = int(np.ceil(target_height_mm / PrinterConfig.LAYER_HEIGHT))
-                target_z_layers_px = max(OPTICAL_LAYERS, min(target_z_layers_px, max_z_layers))
-                optical_start_z_px = target_z_layers_px - OPTICAL_LAYERS
-                for z in range(optical_start_z_px):
-                    full_matrix[z, y, x] = backing_color_id
-                for layer_idx in range(OPTICAL_LAYERS):
-                    z = optical_start_z_px + layer_idx
-                    if z < max_z_layers:
-                        mat_id = material_matrix[y, x, OPTICAL_LAYERS - 1 - layer_idx]
-                        full_matrix[z, y, x] = mat_id
+    # Step 4: Fill voxel matrix (vectorized, same for both height sources)
+    target_z_layers = np.ceil(pixel_heights / PrinterConfig.LAYER_HEIGHT).astype(int)
+    target_z_layers = np.clip(target_z_layers, OPTICAL_LAYERS, max_z_layers)
+    optical_start_z = target_z_layers - OPTICAL_LAYERS
+
+    # Fill backing layers: every Z below the pixel's optical start
+    backing_mask = mask_solid[np.newaxis, :, :] & (
+        np.arange(max_z_layers)[:, np.newaxis, np.newaxis] < optical_start_z[np.newaxis, :, :]
+    )
+    full_matrix[backing_mask] = backing_color_id
+
+    # Fill optical layers: one scatter along Z with a per-pixel start index.
+    # Layer order is flipped (face-up), transparent pixels write air (-1)
+    # at Z=0.. which leaves their all-air column unchanged.
+    flipped = np.ascontiguousarray(
+        material_matrix[:, :, OPTICAL_LAYERS - 1::-1].transpose(2, 0, 1),
+        dtype=full_matrix.dtype
+    )
+    flipped[:, ~mask_solid] = -1
+    start_z = np.where(mask_solid, optical_start_z, 0)
+    dst_z = start_z[np.newaxis, :, :] + np.arange(OPTICAL_LAYERS)[:, np.newaxis, np.newaxis]
+    np.put_along_axis(full_matrix, dst_z, flipped, axis=0)
     
     # Step 5: Relief mode is always single-sided (观赏面朝上)
     backing_z_range = (0, max_z_layers - OPTICAL_LAYERS - 1)
@@ -2038,7 +2189,7 @@ def _build_cloisonne_voxel_matrix(material_matrix, mask_solid, mask_wireframe,
 
     Returns:
         (full_matrix, backing_metadata)
-        full_matrix:      (Z, H, W) int – voxel matrix (-1 = air, -3 = wire).
+        full_matrix:      (Z, H, W) int8 – voxel matrix (-1 = air, -3 = wire).
         backing_metadata:  dict with 'backing_color_id', 'backing_z_range', 'is_cloisonne'.
     """
     target_h, target_w = material_matrix.shape[:2]
@@ -2048,27 +2199,27 @@ def _build_cloisonne_voxel_matrix(material_matrix, mask_solid, mask_wireframe,
     wire_layers = max(1, int(round(wire_height_mm / PrinterConfig.LAYER_HEIGHT)))
 
     total_z = spacer_layers + OPTICAL + wire_layers
-    full_matrix = np.full((total_z, target_h, target_w), -1, dtype=int)
+    full_matrix = np.full((total_z, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
 
     mask_t = ~mask_solid  # transparent
 
     # --- Base / backing ---
-    spacer_slice = np.where(mask_solid, backing_color_id, -1).astype(int)
+    spacer_slice = np.where(mask_solid, np.int8(backing_color_id), np.int8(-1))
     full_matrix[:spacer_layers] = spacer_slice[np.newaxis, :, :]
 
     # --- Colour layers (face-up: reverse material order) ---
     # material_matrix is stored for face-down printing (layer 0 = bottom).
     # For face-up we flip so layer 0 sits at the lowest colour Z.
+    # One write over a layer-major (Z, H, W) view, matching full_matrix
     colour_start = spacer_layers
-    for i in range(OPTICAL):
-        layer = material_matrix[:, :, OPTICAL - 1 - i]
-        z = colour_start + i
-        full_matrix[z] = np.where(mask_solid, layer, -1)
+    full_matrix[colour_start:colour_start + OPTICAL] = np.where(
+        mask_solid, material_matrix[:, :, OPTICAL - 1::-1].transpose(2, 0, 1), -1
+    )
 
     # --- Wire layers (only where mask_wireframe AND mask_solid) ---
     # Use -3 as special marker for wire (will be generated as standalone object)
     wire_mask_2d = mask_wireframe & mask_solid
-    wire_slice = np.where(wire_mask_2d, -3, -1).astype(int)
+    wire_slice = np.where(wire_mask_2d, np.int8(-3), np.int8(-1))
     wire_start = colour_start + OPTICAL
     full_matrix[wire_start:] = wire_slice[np.newaxis, :, :]
 
@@ -2106,39 +2257,31 @@ def _build_voxel_matrix(material_matrix, mask_solid, spacer_thick, structure_mod
     if material_matrix.ndim != 3:
         raise ValueError(f"material_matrix must be 3D (H, W, N), got shape={material_matrix.shape}")
     target_h, target_w, optical_layers = material_matrix.shape
-    mask_transparent = ~mask_solid
-    
-    bottom_voxels = np.transpose(material_matrix, (2, 0, 1))
     
     spacer_layers = max(1, int(round(spacer_thick / PrinterConfig.LAYER_HEIGHT)))
     
     if "双面" in structure_mode or "Double" in structure_mode:
-        top_voxels = np.transpose(material_matrix[..., ::-1], (2, 0, 1))
         total_layers = optical_layers + spacer_layers + optical_layers
-        full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=int)
+        full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
         
-        full_matrix[0:optical_layers] = bottom_voxels
+        # Transposed views are written straight into the matrix (no scratch)
+        full_matrix[0:optical_layers] = material_matrix.transpose(2, 0, 1)
         
-        # Use backing_color_id parameter to mark backing layer
-        spacer = np.full((target_h, target_w), -1, dtype=int)
-        spacer[~mask_transparent] = backing_color_id
-        for z in range(optical_layers, optical_layers + spacer_layers):
-            full_matrix[z] = spacer
+        # Use backing_color_id parameter to mark backing layer: one broadcast
+        # write over all spacer layers at the solid pixels
+        full_matrix[optical_layers:optical_layers + spacer_layers, mask_solid] = backing_color_id
         
-        full_matrix[optical_layers + spacer_layers:] = top_voxels
+        full_matrix[optical_layers + spacer_layers:] = material_matrix[..., ::-1].transpose(2, 0, 1)
         
         backing_z_range = (optical_layers, optical_layers + spacer_layers - 1)
     else:
         total_layers = optical_layers + spacer_layers
-        full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=int)
+        full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
         
-        full_matrix[0:optical_layers] = bottom_voxels
+        full_matrix[0:optical_layers] = material_matrix.transpose(2, 0, 1)
         
         # Use backing_color_id parameter to mark backing layer
-        spacer = np.full((target_h, target_w), -1, dtype=int)
-        spacer[~mask_transparent] = backing_color_id
-        for z in range(optical_layers, total_layers):
-            full_matrix[z] = spacer
+        full_matrix[optical_layers:total_layers, mask_solid] = backing_color_id
         
         backing_z_range = (optical_layers, total_layers - 1)
     
@@ -2196,17 +2339,17 @@ def _build_voxel_matrix_faceup(material_matrix, mask_solid, spacer_thick, backin
     target_h, target_w, optical_layers = material_matrix.shape
     spacer_layers = max(1, int(round(spacer_thick / PrinterConfig.LAYER_HEIGHT)))
     total_layers = spacer_layers + optical_layers
-    full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=int)
+    full_matrix = np.full((total_layers, target_h, target_w), -1, dtype=_VOXEL_DTYPE)
 
     # Backing: solid block at the bottom
-    spacer = np.where(mask_solid, backing_color_id, -1).astype(int)
+    spacer = np.where(mask_solid, np.int8(backing_color_id), np.int8(-1))
     full_matrix[:spacer_layers] = spacer[np.newaxis, :, :]
 
-    # Optical: reversed order so index 0 (viewing surface) → highest Z
-    for i in range(optical_layers):
-        layer = material_matrix[:, :, optical_layers - 1 - i]
-        z = spacer_layers + i
-        full_matrix[z] = np.where(mask_solid, layer, -1)
+    # Optical: reversed order so index 0 (viewing surface) → highest Z,
+    # written in one pass from a layer-major (Z, H, W) view
+    full_matrix[spacer_layers:] = np.where(
+        mask_solid, material_matrix[:, :, ::-1].transpose(2, 0, 1), -1
+    )
 
     backing_z_range = (0, spacer_layers - 1)
     return full_matrix, {
@@ -2215,6 +2358,74 @@ def _build_voxel_matrix_faceup(material_matrix, mask_solid, spacer_thick, backin
     }
 
 
+@functools.lru_cache(maxsize=4)
+def _bed_mesh_inputs(bed_w_mm, bed_h_mm, is_dark=True):
+    """Build the bed texture and quad geometry for _create_bed_mesh.
+
+    Memoized by (bed size, theme): the texture takes hundreds of PIL draw
+    calls and is constant across preview interactions. Callers must not
+    mutate the returned objects.
+
+    Returns:
+        tuple: (texture PIL.Image, verts, faces, uv)
+    """
+    from PIL import Image as PILImage, ImageDraw as PILDraw
+
+    tex_scale = 4  # pixels per mm
+    tex_w = int(bed_w_mm * tex_scale)
+    tex_h = int(bed_h_mm * tex_scale)
+    corner_r = int(8 * tex_scale)
+    margin = max(2, corner_r // 4)
+
+    if is_dark:
+        edge_color = (38, 38, 44)
+        base_color = (58, 58, 66)
+        fine_color = (42, 42, 48)
+        bold_color = (90, 90, 100)
+        border_color = (45, 45, 52)
+    else:
+        edge_color = (215, 215, 220)
+        base_color = (242, 242, 245)
+        fine_color = (225, 225, 230)
+        bold_color = (180, 180, 190)
+        border_color = (195, 195, 205)
+
+    img = PILImage.new('RGB', (tex_w, tex_h), edge_color)
+    draw = PILDraw.Draw(img)
+
+    draw.rounded_rectangle(
+        [margin, margin, tex_w - margin, tex_h - margin],
+        radius=corner_r, fill=base_color
+    )
+
+    step_10 = int(10 * tex_scale)
+    for x in range(0, tex_w, step_10):
+        draw.line([(x, 0), (x, tex_h)], fill=fine_color, width=1)
+    for y in range(0, tex_h, step_10):
+        draw.line([(0, y), (tex_w, y)], fill=fine_color, width=1)
+
+    step_50 = int(50 * tex_scale)
+    for x in range(0, tex_w, step_50):
+        draw.line([(x, 0), (x, tex_h)], fill=bold_color, width=3)
+    for y in range(0, tex_h, step_50):
+        draw.line([(0, y), (tex_w, y)], fill=bold_color, width=3)
+
+    draw.rounded_rectangle(
+        [margin, margin, tex_w - margin, tex_h - margin],
+        radius=corner_r, outline=border_color, width=3
+    )
+
+    # Textured top quad
+    verts = np.array([
+        [0, 0, 0], [bed_w_mm, 0, 0],
+        [bed_w_mm, bed_h_mm, 0], [0, bed_h_mm, 0],
+    ], dtype=np.float64)
+    faces = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int64)
+    uv = np.array([[0, 1], [1, 1], [1, 0], [0, 0]], dtype=np.float64)
+
+    return img, verts, faces, uv
+
+
 def _create_bed_mesh(bed_w_mm, bed_h_mm, is_dark=True):
     """Create a realistic print bed mesh with UV-mapped texture.
     
@@ -2222,68 +2433,19 @@ def _create_bed_mesh(bed_w_mm, bed_h_mm, is_dark=True):
     - Dark (is_dark=True): PEI heated bed style, dark charcoal with subtle grid
     - Light (is_dark=False): Marble/ceramic style, white with dark grid lines
     
+    Texture and geometry come from the memoized _bed_mesh_inputs; a fresh
+    Trimesh is wrapped around them on every call since meshes are mutable.
+    
     Returns a trimesh.Trimesh with TextureVisuals, or None on error.
     """
     try:
-        from PIL import Image as PILImage, ImageDraw as PILDraw
-
-        tex_scale = 4  # pixels per mm
-        tex_w = int(bed_w_mm * tex_scale)
-        tex_h = int(bed_h_mm * tex_scale)
-        corner_r = int(8 * tex_scale)
-        margin = max(2, corner_r // 4)
-
-        if is_dark:
-            edge_color = (38, 38, 44)
-            base_color = (58, 58, 66)
-            fine_color = (42, 42, 48)
-            bold_color = (90, 90, 100)
-            border_color = (45, 45, 52)
-        else:
-            edge_color = (215, 215, 220)
-            base_color = (242, 242, 245)
-            fine_color = (225, 225, 230)
-            bold_color = (180, 180, 190)
-            border_color = (195, 195, 205)
-
-        img = PILImage.new('RGB', (tex_w, tex_h), edge_color)
-        draw = PILDraw.Draw(img)
-
-        draw.rounded_rectangle(
-            [margin, margin, tex_w - margin, tex_h - margin],
-            radius=corner_r, fill=base_color
-        )
-
-        step_10 = int(10 * tex_scale)
-        for x in range(0, tex_w, step_10):
-            draw.line([(x, 0), (x, tex_h)], fill=fine_color, width=1)
-        for y in range(0, tex_h, step_10):
-            draw.line([(0, y), (tex_w, y)], fill=fine_color, width=1)
-
-        step_50 = int(50 * tex_scale)
-        for x in range(0, tex_w, step_50):
-            draw.line([(x, 0), (x, tex_h)], fill=bold_color, width=3)
-        for y in range(0, tex_h, step_50):
-            draw.line([(0, y), (tex_w, y)], fill=bold_color, width=3)
-
-        draw.rounded_rectangle(
-            [margin, margin, tex_w - margin, tex_h - margin],
-            radius=corner_r, outline=border_color, width=3
-        )
-
-        # Textured top quad
-        verts = np.array([
-            [0, 0, 0], [bed_w_mm, 0, 0],
-            [bed_w_mm, bed_h_mm, 0], [0, bed_h_mm, 0],
-        ], dtype=np.float64)
-        faces = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int64)
-        uv = np.array([[0, 1], [1, 1], [1, 0], [0, 0]], dtype=np.float64)
+        img, verts, faces, uv = _bed_mesh_inputs(bed_w_mm, bed_h_mm, bool(is_dark))
 
         from trimesh.visual.material import SimpleMaterial
         from trimesh.visual import TextureVisuals
 
-        mesh = trimesh.Trimesh(vertices=verts, faces=faces, process=False)
-        mesh.visual = TextureVisuals(uv=uv, material=SimpleMaterial(image=img))
+        mesh = trimesh.Trimesh(vertices=verts.copy(), faces=faces.copy(), process=False)
+        mesh.visual = TextureVisuals(uv=uv.copy(), material=SimpleMaterial(image=img))
 
         theme_name = "dark" if is_dark else "light"
         print(f"[BED] Created {theme_name} {bed_w_mm}×{bed_h_mm}mm bed")
@@ -2296,6 +2458,162 @@ def _create_bed_mesh(bed_w_mm, bed_h_mm, is_dark=True):
         return None
 
 
+_PREVIEW_CUBE_FACES = np.array([
+    [0, 2, 1], [0, 3, 2],
+    [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4],
+    [1, 2, 6], [1, 6, 5],
+    [2, 3, 7], [2, 7, 6],
+    [3, 0, 4], [3, 4, 7]
+], dtype=np.int64)
+
+
+def _build_preview_voxel_arrays(mask_solid, matched_rgb, backing_rgba,
+                                backing_start, backing_end, total_layers,
+                                shrink, has_backing):
+    """Emit per-pixel preview boxes into pre-sized vertex/face/color arrays.
+
+    Boxes per solid pixel (in emission order): the backing box, then the
+    bottom box (if backing_start > 0) and the top box (if backing ends below
+    total_layers). Without backing a single 0..total_layers box is emitted.
+    JIT-compiled with numba when available, otherwise replaced by
+    _build_preview_voxel_arrays_numpy.
+
+    Returns:
+        tuple: (vertices (N*8, 3) float64, faces (N*12, 3) int64,
+                face_colors (N*12, 4) uint8)
+    """
+    height, width = mask_solid.shape
+
+    # Z ranges and colour source of each box stacked on a pixel
+    z_lo = np.empty(3, dtype=np.float64)
+    z_hi = np.empty(3, dtype=np.float64)
+    use_backing = np.zeros(3, dtype=np.bool_)
+    boxes_per_px = 0
+    if has_backing:
+        z_lo[0] = backing_start
+        z_hi[0] = backing_end + 1
+        use_backing[0] = True
+        boxes_per_px = 1
+        if backing_start > 0:
+            z_lo[boxes_per_px] = 0
+            z_hi[boxes_per_px] = backing_start
+            boxes_per_px += 1
+        if backing_end + 1 < total_layers:
+            z_lo[boxes_per_px] = backing_end + 1
+            z_hi[boxes_per_px] = total_layers
+            boxes_per_px += 1
+    else:
+        z_lo[0] = 0
+        z_hi[0] = total_layers
+        boxes_per_px = 1
+
+    # Pass 1: count solid pixels to size the outputs
+    n_solid = 0
+    for y in range(height):
+        for x in range(width):
+            if mask_solid[y, x]:
+                n_solid += 1
+
+    n_boxes = n_solid * boxes_per_px
+    vertices = np.empty((n_boxes * 8, 3), dtype=np.float64)
+    faces = np.empty((n_boxes * 12, 3), dtype=np.int64)
+    face_colors = np.empty((n_boxes * 12, 4), dtype=np.uint8)
+
+    # Pass 2: fill
+    box = 0
+    for y in range(height):
+        world_y = height - 1 - y
+        for x in range(width):
+            if not mask_solid[y, x]:
+                continue
+            x0 = x + shrink
+            x1 = x + 1 - shrink
+            y0 = world_y + shrink
+            y1 = world_y + 1 - shrink
+            for b in range(boxes_per_px):
+                v = box * 8
+                for k in range(2):
+                    z = z_lo[b] if k == 0 else z_hi[b]
+                    o = v + k * 4
+                    vertices[o, 0] = x0
+                    vertices[o, 1] = y0
+                    vertices[o + 1, 0] = x1
+                    vertices[o + 1, 1] = y0
+                    vertices[o + 2, 0] = x1
+                    vertices[o + 2, 1] = y1
+                    vertices[o + 3, 0] = x0
+                    vertices[o + 3, 1] = y1
+                    for i in range(4):
+                        vertices[o + i, 2] = z
+                f = box * 12
+                for i in range(12):
+                    for j in range(3):
+                        faces[f + i, j] = _PREVIEW_CUBE_FACES[i, j] + v
+                    if use_backing[b]:
+                        for c in range(4):
+                            face_colors[f + i, c] = backing_rgba[c]
+                    else:
+                        for c in range(3):
+                            face_colors[f + i, c] = matched_rgb[y, x, c]
+                        face_colors[f + i, 3] = 255
+                box += 1
+
+    return vertices, faces, face_colors
+
+
+def _build_preview_voxel_arrays_numpy(mask_solid, matched_rgb, backing_rgba,
+                                      backing_start, backing_end, total_layers,
+                                      shrink, has_backing):
+    """NumPy build of _build_preview_voxel_arrays (used without numba).
+
+    Broadcasts one template box over all solid pixels instead of looping:
+    vertices are (N, boxes, 2, 4, 3) footprint corners x z-planes, faces
+    are _PREVIEW_CUBE_FACES offset by 8 per box. Same emission order.
+    """
+    height = mask_solid.shape[0]
+
+    # (z_lo, z_hi, use_backing) of each box stacked on a pixel
+    if has_backing:
+        boxes = [(backing_start, backing_end + 1, True)]
+        if backing_start > 0:
+            boxes.append((0, backing_start, False))
+        if backing_end + 1 < total_layers:
+            boxes.append((backing_end + 1, total_layers, False))
+    else:
+        boxes = [(0, total_layers, False)]
+
+    ys, xs = np.nonzero(mask_solid)
+    n_solid, n_box = len(ys), len(boxes)
+    world_y = height - 1 - ys
+    x0, x1 = xs + shrink, xs + 1 - shrink
+    y0, y1 = world_y + shrink, world_y + 1 - shrink
+
+    vertices = np.empty((n_solid, n_box, 2, 4, 3), dtype=np.float64)
+    vertices[..., 0] = np.stack([x0, x1, x1, x0], axis=1)[:, None, None, :]
+    vertices[..., 1] = np.stack([y0, y0, y1, y1], axis=1)[:, None, None, :]
+    vertices[..., 2] = np.array([b[:2] for b in boxes], dtype=np.float64)[None, :, :, None]
+
+    faces = _PREVIEW_CUBE_FACES[None] + (np.arange(n_solid * n_box, dtype=np.int64) * 8)[:, None, None]
+
+    rgba = np.empty((n_solid, 4), dtype=np.uint8)
+    rgba[:, :3] = matched_rgb[ys, xs]
+    rgba[:, 3] = 255
+    face_colors = np.empty((n_solid, n_box, 12, 4), dtype=np.uint8)
+    for b, (_, _, use_backing) in enumerate(boxes):
+        face_colors[:, b] = backing_rgba if use_backing else rgba[:, None, :]
+
+    return vertices.reshape(-1, 3), faces.reshape(-1, 3), face_colors.reshape(-1, 4)
+
+
+# Preview kernels are compiled with nogil=True so concurrent Gradio worker
+# threads (loop drag, highlight, backing updates) do not serialize on the GIL.
+if HAS_NUMBA:
+    _build_preview_voxel_arrays = numba.njit(cache=True, nogil=True)(_build_preview_voxel_arrays)
+else:
+    _build_preview_voxel_arrays = _build_preview_voxel_arrays_numpy
+
+
 def _create_preview_mesh(matched_rgb, mask_solid, total_layers, backing_color_id=0, backing_z_range=None, preview_colors=None):
     """Create simplified 3D preview mesh for browser display.
     为浏览器显示创建简化的 3D 预览网格。
@@ -2330,131 +2648,52 @@ def _create_preview_mesh(matched_rgb, mask_solid, total_layers, backing_color_id
             matched_rgb, (new_width, new_height),
             interpolation=cv2.INTER_AREA
         )
+        # INTER_AREA is already a tight SIMD pass here (a NumPy block mean
+        # measured ~20x slower); the mask only skips its two dtype copies by
+        # resizing through zero-copy uint8/bool views
         mask_solid = cv2.resize(
-            mask_solid.astype(np.uint8), (new_width, new_height),
+            np.ascontiguousarray(mask_solid, dtype=np.bool_).view(np.uint8),
+            (new_width, new_height),
             interpolation=cv2.INTER_NEAREST
-        ).astype(bool)
+        ).view(np.bool_)
 
         height, width = new_height, new_width
         shrink = 0.05 * scale_factor
     else:
         shrink = 0.05
 
-    vertices = []
-    faces = []
-    face_colors = []
-
-    for y in range(height):
-        for x in range(width):
-            if not mask_solid[y, x]:
-                continue
-
-            rgb = matched_rgb[y, x]
-            rgba = [int(rgb[0]), int(rgb[1]), int(rgb[2]), 255]
-
-            world_y = (height - 1 - y)
-            x0, x1 = x + shrink, x + 1 - shrink
-            y0, y1 = world_y + shrink, world_y + 1 - shrink
-
-            # Determine Z range for this pixel
-            # If backing_z_range is provided, split the model into backing and non-backing layers
-            if backing_z_range is not None and preview_colors is not None:
-                backing_start, backing_end = backing_z_range
-
-                # Create backing layer box
-                z0_backing = backing_start
-                z1_backing = backing_end + 1
-
-                base_idx = len(vertices)
-                vertices.extend([
-                    [x0, y0, z0_backing], [x1, y0, z0_backing], [x1, y1, z0_backing], [x0, y1, z0_backing],
-                    [x0, y0, z1_backing], [x1, y0, z1_backing], [x1, y1, z1_backing], [x0, y1, z1_backing]
-                ])
-
-                # Apply backing color
-                # When backing_color_id=-2 (separate backing), use white color (material_id=0)
-                actual_backing_color_id = 0 if backing_color_id == -2 else backing_color_id
-                backing_rgba = [int(preview_colors[actual_backing_color_id][0]),
-                               int(preview_colors[actual_backing_color_id][1]),
-                               int(preview_colors[actual_backing_color_id][2]), 255]
-
-                cube_faces = [
-                    [0, 2, 1], [0, 3, 2],
-                    [4, 5, 6], [4, 6, 7],
-                    [0, 1, 5], [0, 5, 4],
-                    [1, 2, 6], [1, 6, 5],
-                    [2, 3, 7], [2, 7, 6],
-                    [3, 0, 4], [3, 4, 7]
-                ]
-
-                for f in cube_faces:
-                    faces.append([v + base_idx for v in f])
-                    face_colors.append(backing_rgba)
-
-                # Create non-backing layers (if any exist)
-                # Bottom layers (0 to backing_start)
-                if backing_start > 0:
-                    z0_bottom = 0
-                    z1_bottom = backing_start
-
-                    base_idx = len(vertices)
-                    vertices.extend([
-                        [x0, y0, z0_bottom], [x1, y0, z0_bottom], [x1, y1, z0_bottom], [x0, y1, z0_bottom],
-                        [x0, y0, z1_bottom], [x1, y0, z1_bottom], [x1, y1, z1_bottom], [x0, y1, z1_bottom]
-                    ])
-
-                    for f in cube_faces:
-                        faces.append([v + base_idx for v in f])
-                        face_colors.append(rgba)
-
-                # Top layers (backing_end+1 to total_layers)
-                if backing_end + 1 < total_layers:
-                    z0_top = backing_end + 1
-                    z1_top = total_layers
-
-                    base_idx = len(vertices)
-                    vertices.extend([
-                        [x0, y0, z0_top], [x1, y0, z0_top], [x1, y1, z0_top], [x0, y1, z0_top],
-                        [x0, y0, z1_top], [x1, y0, z1_top], [x1, y1, z1_top], [x0, y1, z1_top]
-                    ])
-
-                    for f in cube_faces:
-                        faces.append([v + base_idx for v in f])
-                        face_colors.append(rgba)
-            else:
-                # Original behavior: single box from 0 to total_layers
-                z0, z1 = 0, total_layers
-
-                base_idx = len(vertices)
-                vertices.extend([
-                    [x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],
-                    [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1]
-                ])
-
-                cube_faces = [
-                    [0, 2, 1], [0, 3, 2],
-                    [4, 5, 6], [4, 6, 7],
-                    [0, 1, 5], [0, 5, 4],
-                    [1, 2, 6], [1, 6, 5],
-                    [2, 3, 7], [2, 7, 6],
-                    [3, 0, 4], [3, 4, 7]
-                ]
-
-                for f in cube_faces:
-                    faces.append([v + base_idx for v in f])
-                    face_colors.append(rgba)
+    # If backing_z_range is provided, split each pixel column into backing and
+    # non-backing boxes; otherwise emit a single box from 0 to total_layers.
+    has_backing = backing_z_range is not None and preview_colors is not None
+    backing_start, backing_end = backing_z_range if has_backing else (0, 0)
+    backing_rgba = np.full(4, 255, dtype=np.uint8)
+    if has_backing:
+        # When backing_color_id=-2 (separate backing), use white color (material_id=0)
+        actual_backing_color_id = 0 if backing_color_id == -2 else backing_color_id
+        backing_rgba[:3] = np.asarray(preview_colors[actual_backing_color_id][:3]).astype(np.uint8)
+
+    vertices, faces, face_colors = _build_preview_voxel_arrays(
+        np.ascontiguousarray(mask_solid, dtype=np.bool_),
+        np.ascontiguousarray(matched_rgb, dtype=np.uint8),
+        backing_rgba, int(backing_start), int(backing_end),
+        int(total_layers), float(shrink), has_backing
+    )
 
-    if not vertices:
+    if len(vertices) == 0:
         return None
 
     mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
-    mesh.visual.face_colors = np.array(face_colors, dtype=np.uint8)
+    mesh.visual.face_colors = face_colors
 
     print(f"[PREVIEW] Generated: {len(mesh.vertices):,} vertices, {len(mesh.faces):,} faces")
 
     return mesh
 
 
+# (bed_w, bed_h, theme) -> exported empty-bed GLB path, see generate_empty_bed_glb
+_EMPTY_BED_GLB_PATHS = {}
+
+
 def generate_empty_bed_glb(bed_w: int = None, bed_h: int = None, is_dark: bool = False):
     """Generate a GLB file containing only the print bed (no model).
     生成仅包含打印热床的 GLB 文件（无模型）。
@@ -2470,13 +2709,31 @@ def generate_empty_bed_glb(bed_w: int = None, bed_h: int = None, is_dark: bool =
     try:
         if bed_w is None or bed_h is None:
             bed_w, bed_h = BedManager.get_bed_size(BedManager.DEFAULT_BED)
+        theme_name = "dark" if is_dark else "light"
+        key = (bed_w, bed_h, theme_name)
+        # The empty bed is constant per (size, theme): reuse this process's
+        # previous export while the file is still there
+        cached_path = _EMPTY_BED_GLB_PATHS.get(key)
+        if cached_path is not None and os.path.isfile(cached_path):
+            return cached_path
         bed_mesh = _create_bed_mesh(bed_w, bed_h, is_dark=is_dark)
         if bed_mesh is None:
             return None
         glb_scene = trimesh.Scene()
         glb_scene.add_geometry(bed_mesh, node_name="bed")
-        glb_path = os.path.join(OUTPUT_DIR, f"empty_bed_{bed_w}x{bed_h}.glb")
-        glb_scene.export(glb_path)
+        glb_path = os.path.join(OUTPUT_DIR, f"empty_bed_{bed_w}x{bed_h}_{theme_name}.glb")
+        # Write to a temp file and rename so concurrent readers never see a
+        # partially written GLB
+        fd, tmp_path = tempfile.mkstemp(dir=OUTPUT_DIR, suffix='.glb.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(glb_scene.export(file_type='glb'))
+            os.replace(tmp_path, glb_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _EMPTY_BED_GLB_PATHS[key] = glb_path
         return glb_path
     except Exception as e:
         print(f"[EMPTY_BED] Failed: {e}")
@@ -2856,7 +3113,7 @@ def generate_preview_cached(image_path, lut_path, target_width_mm,
     color_conf = ColorSystem.get(color_mode)
     
     try:
-        processor = LuminaImageProcessor(actual_lut_path, color_mode)
+        processor = _get_processor(actual_lut_path, color_mode)
         processor.enable_cleanup = enable_cleanup
         result = processor.process_image(
             image_path=image_path,
@@ -2876,9 +3133,7 @@ def generate_preview_cached(image_path, lut_path, target_width_mm,
     mask_solid = result['mask_solid']
     target_w, target_h = result['dimensions']
     
-    preview_rgba = np.zeros((target_h, target_w, 4), dtype=np.uint8)
-    preview_rgba[mask_solid, :3] = matched_rgb[mask_solid]
-    preview_rgba[mask_solid, 3] = 255
+    preview_rgba = _build_preview_rgba(matched_rgb, mask_solid)
     
     cache = {
         'target_w': target_w,
@@ -2914,19 +3169,14 @@ def generate_preview_cached(image_path, lut_path, target_width_mm,
     return display, cache, f"[OK] Preview ({target_w}×{target_h}px, {num_colors} colors) | Click image to place loop"
 
 
-def render_preview(preview_rgba, loop_pos, loop_width, loop_length, 
-                   loop_hole, loop_angle, loop_enabled, color_conf,
-                   bed_label=None, target_width_mm=None, is_dark=True):
-    """Render preview with physical bed grid and optional keychain loop.
-    
-    Args:
-        bed_label: BedManager label (e.g. "256×256 mm"). Falls back to default.
-        target_width_mm: Physical width of the model in mm. If None, estimates from pixels.
-        is_dark: True for dark PEI theme, False for light marble theme.
+@functools.lru_cache(maxsize=8)
+def _bed_background(bed_w_mm, bed_h_mm, is_dark=True):
+    """Render the empty bed (grid, border, axes, mm labels) for render_preview.
+
+    Memoized by (bed size, theme): it does not depend on the model, so
+    slider drags and clicks only pay for a copy plus the model paste.
+    The returned image is shared; callers must copy before drawing.
     """
-    if bed_label is None:
-        bed_label = BedManager.DEFAULT_BED
-    bed_w_mm, bed_h_mm = BedManager.get_bed_size(bed_label)
     ppm = BedManager.compute_scale(bed_w_mm, bed_h_mm)
 
     canvas_w = int(bed_w_mm * ppm)
@@ -2964,19 +3214,22 @@ def render_preview(preview_rgba, loop_pos, loop_width, loop_length,
         radius=corner_r, fill=bed_bg
     )
 
-    # --- grid lines ---
+    # --- grid lines (direct array writes, pixel-identical to PIL lines) ---
     step_10 = max(1, int(10 * ppm))
     step_50 = max(1, int(50 * ppm))
 
-    for x in range(margin, total_w, step_10):
-        draw.line([(x, 0), (x, canvas_h)], fill=grid_fine, width=1)
-    for y in range(0, canvas_h, step_10):
-        draw.line([(margin, y), (total_w, y)], fill=grid_fine, width=1)
+    arr = np.array(canvas)
+    arr[:canvas_h + 1, margin::step_10] = grid_fine
+    arr[:canvas_h:step_10, margin:] = grid_fine
+
+    # Bold lines are 2px wide: column x / row y plus the following one
+    arr[:canvas_h + 1, margin::step_50] = grid_bold
+    arr[:canvas_h + 1, margin + 1::step_50] = grid_bold
+    arr[:canvas_h:step_50, margin:] = grid_bold
+    arr[1:canvas_h + 1:step_50, margin:] = grid_bold
 
-    for x in range(margin, total_w, step_50):
-        draw.line([(x, 0), (x, canvas_h)], fill=grid_bold, width=2)
-    for y in range(0, canvas_h, step_50):
-        draw.line([(margin, y), (total_w, y)], fill=grid_bold, width=2)
+    canvas = Image.fromarray(arr)
+    draw = ImageDraw.Draw(canvas)
 
     # Rounded border on top of grid
     draw.rounded_rectangle(
@@ -3004,6 +3257,30 @@ def render_preview(preview_rgba, loop_pos, loop_width, loop_length,
         if px >= 0 and font:
             draw.text((2, px - 5), f"{mm}", fill=label_color, font=font)
 
+    return canvas
+
+
+def render_preview(preview_rgba, loop_pos, loop_width, loop_length, 
+                   loop_hole, loop_angle, loop_enabled, color_conf,
+                   bed_label=None, target_width_mm=None, is_dark=True):
+    """Render preview with physical bed grid and optional keychain loop.
+    
+    Args:
+        bed_label: BedManager label (e.g. "256×256 mm"). Falls back to default.
+        target_width_mm: Physical width of the model in mm. If None, estimates from pixels.
+        is_dark: True for dark PEI theme, False for light marble theme.
+    """
+    if bed_label is None:
+        bed_label = BedManager.DEFAULT_BED
+    bed_w_mm, bed_h_mm = BedManager.get_bed_size(bed_label)
+    ppm = BedManager.compute_scale(bed_w_mm, bed_h_mm)
+
+    canvas_w = int(bed_w_mm * ppm)
+    canvas_h = int(bed_h_mm * ppm)
+    margin = int(30 * ppm / 3)
+
+    canvas = _bed_background(bed_w_mm, bed_h_mm, bool(is_dark)).copy()
+
     # --- paste model centred on bed ---
     if preview_rgba is not None:
         h, w = preview_rgba.shape[:2]
@@ -3039,6 +3316,55 @@ def render_preview(preview_rgba, loop_pos, loop_width, loop_length,
     return np.array(canvas)
 
 
+@functools.lru_cache(maxsize=64)
+def _render_loop_layer(loop_w_px, loop_h_px, hole_r_px, loop_angle, loop_size):
+    """Render the keychain loop marker as a (loop_size, loop_size) RGBA image.
+
+    Memoized on the pixel geometry and integer angle, so dragging the loop
+    around only costs a paste. The returned image is shared; do not modify it.
+    """
+    circle_r_px = loop_w_px // 2
+    lc = loop_size // 2
+    rect_h = max(1, loop_h_px - circle_r_px)
+    half_w = loop_w_px // 2
+    border = 2
+
+    loop_color = (220, 60, 60, 200)
+    outline_color = (255, 255, 255, 255)
+
+    # Rasterize directly: each shape is painted as outline colour, then its
+    # inset interior as fill, in the same order PIL would draw them
+    yy, xx = np.ogrid[:loop_size, :loop_size]
+    dx = xx - lc
+    dy = yy - lc
+    dist2 = dx * dx + dy * dy
+    rect = (np.abs(dx) <= half_w) & (dy >= 0) & (dy <= rect_h)
+    rect_inner = (np.abs(dx) <= half_w - border) & (dy >= border) & (dy <= rect_h - border)
+    circle = dist2 <= circle_r_px * circle_r_px
+    inner_r = max(circle_r_px - border, 0)
+    circle_inner = (dist2 <= inner_r * inner_r) & (circle_r_px > border)
+    hole = dist2 <= hole_r_px * hole_r_px
+
+    arr = np.zeros((loop_size, loop_size, 4), dtype=np.uint8)
+    arr[rect] = outline_color
+    arr[rect_inner] = loop_color
+    arr[circle] = outline_color
+    arr[circle_inner] = loop_color
+    arr[hole] = 0
+    loop_layer = Image.fromarray(arr)
+    
+    if loop_angle != 0:
+        # Flat-colour primitive: bilinear is visually identical to bicubic,
+        # and right-angle turns are exact with nearest
+        resample = Image.NEAREST if loop_angle % 90 == 0 else Image.BILINEAR
+        loop_layer = loop_layer.rotate(
+            -loop_angle, center=(lc, lc),
+            expand=False, resample=resample
+        )
+    
+    return loop_layer
+
+
 def _draw_loop_on_canvas(pil_img, loop_pos, loop_width, loop_length, 
                          loop_hole, loop_angle, color_conf, margin,
                          ppm=None, img_offset=None, mm_per_px=None):
@@ -3065,39 +3391,16 @@ def _draw_loop_on_canvas(pil_img, loop_pos, loop_width, loop_length,
     cx = img_offset[0] + int(loop_pos[0] * mm_per_px * ppm)
     cy = img_offset[1] + int(loop_pos[1] * mm_per_px * ppm)
     
-    loop_size = max(loop_w_px, loop_h_px) * 2 + 20
-    loop_layer = Image.new('RGBA', (loop_size, loop_size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(loop_layer)
-    
-    lc = loop_size // 2
     rect_h = max(1, loop_h_px - circle_r_px)
-    
-    loop_color = (220, 60, 60, 200)
-    outline_color = (255, 255, 255, 255)
-    
-    draw.rectangle(
-        [lc - loop_w_px//2, lc, lc + loop_w_px//2, lc + rect_h],
-        fill=loop_color, outline=outline_color, width=2
-    )
-    
-    draw.ellipse(
-        [lc - circle_r_px, lc - circle_r_px,
-         lc + circle_r_px, lc + circle_r_px],
-        fill=loop_color, outline=outline_color, width=2
-    )
-    
-    draw.ellipse(
-        [lc - hole_r_px, lc - hole_r_px,
-         lc + hole_r_px, lc + hole_r_px],
-        fill=(0, 0, 0, 0)
+    # Tight square around the rotation centre: it must hold the farthest
+    # body corner (loop_w/2, rect_h) at any angle, plus resampling slack
+    loop_size = 2 * int(np.ceil(np.hypot(loop_w_px // 2, rect_h))) + 6
+    lc = loop_size // 2
+
+    loop_layer = _render_loop_layer(
+        loop_w_px, loop_h_px, hole_r_px, int(round(loop_angle)), loop_size
     )
     
-    if loop_angle != 0:
-        loop_layer = loop_layer.rotate(
-            -loop_angle, center=(lc, lc),
-            expand=False, resample=Image.BICUBIC
-        )
-    
     paste_x = cx - lc
     paste_y = cy - lc - rect_h // 2
     pil_img.paste(loop_layer, (paste_x, paste_y), loop_layer)
@@ -3105,20 +3408,22 @@ def _draw_loop_on_canvas(pil_img, loop_pos, loop_width, loop_length,
     return pil_img
 
 
-def on_preview_click(cache, loop_pos, evt: gr.SelectData, bed_label=None):
-    """Handle preview image click event."""
-    if evt is None or cache is None:
-        return loop_pos, False, "Invalid click - please generate preview first"
-    
-    if bed_label is None:
-        bed_label = BedManager.DEFAULT_BED
+def _click_calibration(cache, bed_label):
+    """Return click→pixel calibration for the preview canvas, cached per bed.
 
-    click_x, click_y = evt.index
-    
+    Returns ``(offset_x, offset_y, px_scale, scale_900x600, scale_1200x750)``
+    where ``px_scale`` is canvas pixels per image pixel and the two scales are
+    the display down-scales used by the legacy and current preview widgets.
+    The entry is keyed by bed and model size, so a bed change recomputes it.
+    """
     target_w = cache['target_w']
     target_h = cache['target_h']
     target_width_mm = cache.get('target_width_mm')
-    
+    key = (bed_label, target_w, target_h, target_width_mm)
+    entry = cache.get('_click_calib')
+    if entry is not None and entry[0] == key:
+        return entry[1]
+
     bed_w_mm, bed_h_mm = BedManager.get_bed_size(bed_label)
     ppm = BedManager.compute_scale(bed_w_mm, bed_h_mm)
     margin = int(30 * ppm / 3)
@@ -3139,21 +3444,37 @@ def on_preview_click(cache, loop_pos, evt: gr.SelectData, bed_label=None):
     offset_x = margin + (int(bed_w_mm * ppm) - new_w) // 2
     offset_y = (int(bed_h_mm * ppm) - new_h) // 2
 
-    # Gradio may scale the displayed image
-    gradio_display_height = 600
-    gradio_display_width = 900
-    scale_by_height = gradio_display_height / canvas_h
-    scale_by_width = gradio_display_width / canvas_w
-    gradio_scale = min(1.0, scale_by_height, scale_by_width)
-    
-    canvas_click_x = click_x / gradio_scale
-    canvas_click_y = click_y / gradio_scale
-    
-    # Convert from canvas coords to original image pixel coords
     # Each pixel in original image = (model_w_mm / target_w) mm
     mm_per_px = model_w_mm / target_w
-    img_click_x = (canvas_click_x - offset_x) / (mm_per_px * ppm)
-    img_click_y = (canvas_click_y - offset_y) / (mm_per_px * ppm)
+    calib = (
+        offset_x,
+        offset_y,
+        mm_per_px * ppm,
+        min(1.0, 600 / canvas_h, 900 / canvas_w),
+        min(1.0, 1200 / canvas_w, 750 / canvas_h),
+    )
+    cache['_click_calib'] = (key, calib)
+    return calib
+
+
+def on_preview_click(cache, loop_pos, evt: gr.SelectData, bed_label=None):
+    """Handle preview image click event."""
+    if evt is None or cache is None:
+        return loop_pos, False, "Invalid click - please generate preview first"
+    
+    if bed_label is None:
+        bed_label = BedManager.DEFAULT_BED
+
+    click_x, click_y = evt.index
+    
+    target_w = cache['target_w']
+    target_h = cache['target_h']
+    
+    offset_x, offset_y, px_scale, gradio_scale, _ = _click_calibration(cache, bed_label)
+
+    # Gradio may scale the displayed image (900×600 box)
+    img_click_x = (click_x / gradio_scale - offset_x) / px_scale
+    img_click_y = (click_y / gradio_scale - offset_y) / px_scale
     
     orig_x = max(0, min(target_w - 1, img_click_x))
     orig_y = max(0, min(target_h - 1, img_click_y))
@@ -3168,7 +3489,9 @@ def update_preview_with_loop(cache, loop_pos, add_loop,
     if cache is None:
         return None
     
-    preview_rgba = cache['preview_rgba'].copy()
+    # render_preview only reads preview_rgba (the loop is drawn on the bed
+    # canvas), so the cached array is passed without a copy
+    preview_rgba = cache['preview_rgba']
     color_conf = cache['color_conf']
     target_width_mm = cache.get('target_width_mm')
     is_dark = cache.get('is_dark', True)
@@ -3194,7 +3517,7 @@ def generate_final_model(image_path, lut_path, target_width_mm, spacer_thick,
                         add_loop, loop_width, loop_length, loop_hole, loop_pos,
                         modeling_mode=ModelingMode.VECTOR, quantize_colors=64,
                         color_replacements=None, replacement_regions=None, backing_color_name="White",
-                        separate_backing=False, enable_relief=False, color_height_map=None,
+                        separate_backing: bool = False, enable_relief=False, color_height_map=None,
                         height_mode: str = "color",
                         heightmap_path=None, heightmap_max_height=None,
                         enable_cleanup=True,
@@ -3220,12 +3543,8 @@ def generate_final_model(image_path, lut_path, target_width_mm, spacer_thick,
         height_mode: "color" or "heightmap", determines relief branch selection
     """
     # Convert backing color name to ID or use special marker for separate backing
-    # Error handling for separate_backing parameter (Requirement 8.4)
-    try:
-        separate_backing = bool(separate_backing) if separate_backing is not None else False
-    except Exception as e:
-        print(f"[CONVERTER] Error reading separate_backing parameter: {e}, using default (False)")
-        separate_backing = False
+    # Guard for separate_backing parameter (Requirement 8.4)
+    separate_backing = separate_backing is True
     
     if separate_backing:
         backing_color_id = -2  # Special marker for separate backing
@@ -3270,6 +3589,49 @@ def generate_final_model(image_path, lut_path, target_width_mm, spacer_thick,
 
 # ========== Color Replacement Functions ==========
 
+if HAS_NUMBA:
+    @numba.njit(cache=True, nogil=True)
+    def _apply_backing_color_numba(material_matrix, mask_solid, preview_rgba, r, g, b):
+        height, width, n_layers = material_matrix.shape
+        count = 0
+        for y in range(height):
+            for x in range(width):
+                if not mask_solid[y, x]:
+                    continue
+                backing_only = True
+                for k in range(n_layers):
+                    if material_matrix[y, x, k] != -1:
+                        backing_only = False
+                        break
+                if backing_only:
+                    preview_rgba[y, x, 0] = r
+                    preview_rgba[y, x, 1] = g
+                    preview_rgba[y, x, 2] = b
+                    preview_rgba[y, x, 3] = 255
+                    count += 1
+        return count
+else:
+    _apply_backing_color_numba = None
+
+
+def _apply_backing_color(material_matrix, mask_solid, preview_rgba, r, g, b):
+    """Paint backing-only pixels (solid, every material layer -1) in place.
+
+    With numba this is one pass with an early exit per pixel, avoiding the
+    (H, W, N) ``np.all`` temporary and the boolean-mask writes.
+
+    Returns:
+        int: Number of pixels painted.
+    """
+    if _apply_backing_color_numba is not None:
+        return _apply_backing_color_numba(material_matrix, mask_solid, preview_rgba, r, g, b)
+
+    backing_only_mask = mask_solid & np.all(material_matrix == -1, axis=2)
+    preview_rgba[backing_only_mask, :3] = (r, g, b)
+    preview_rgba[backing_only_mask, 3] = 255
+    return int(np.count_nonzero(backing_only_mask))
+
+
 def update_preview_with_backing_color(cache, backing_color_id: int):
     """
     Update preview image with new backing color without re-processing the entire image.
@@ -3310,13 +3672,14 @@ def update_preview_with_backing_color(cache, backing_color_id: int):
         # Get data from cache
         material_matrix = cache['material_matrix']
         mask_solid = cache['mask_solid']
+        # Paint a private copy: shallow cache copies share the cached preview,
+        # and the error path must still return the untouched original
         preview_rgba = cache['preview_rgba'].copy()
         
         target_h, target_w = material_matrix.shape[:2]
         
         # Get backing color from color system
-        backing_color_rgba = color_conf['preview'][backing_color_id]
-        backing_color_rgb = backing_color_rgba[:3]
+        backing_color_rgb = ColorSystem.preview_array(color_conf)[backing_color_id, :3]
         
         # Identify backing area: solid pixels that would be marked as backing in voxel matrix
         # In the voxel matrix, backing layers are at z=5 onwards (after the 5 color layers)
@@ -3368,21 +3731,20 @@ def update_preview_with_backing_color(cache, backing_color_id: int):
         # Looking at material_matrix: (H, W, 5) - this is 5 color layers
         # If all 5 layers are transparent (-1) but the pixel is solid, it's backing-only
         
-        # Check for backing-only pixels: solid pixels where all material layers are -1
-        all_layers_transparent = np.all(material_matrix == -1, axis=2)
-        backing_only_mask = mask_solid & all_layers_transparent
-        
-        # Update backing-only areas with new backing color
-        if np.any(backing_only_mask):
-            preview_rgba[backing_only_mask, :3] = backing_color_rgb
-            preview_rgba[backing_only_mask, 3] = 255
-            print(f"[CONVERTER] Updated {np.sum(backing_only_mask)} backing-only pixels with color {color_conf['slots'][backing_color_id]}")
+        # Check for backing-only pixels: solid pixels where all material layers are -1,
+        # and update them with the new backing color
+        r, g, b = (int(c) for c in backing_color_rgb)
+        backing_count = _apply_backing_color(
+            material_matrix, mask_solid, preview_rgba, r, g, b
+        )
+        if backing_count > 0:
+            print(f"[CONVERTER] Updated {backing_count} backing-only pixels with color {color_conf['slots'][backing_color_id]}")
         else:
             print(f"[CONVERTER] No backing-only pixels found in preview")
         
         # Update cache with new backing_color_id
         cache['backing_color_id'] = backing_color_id
-        cache['preview_rgba'] = preview_rgba.copy()
+        cache['preview_rgba'] = preview_rgba
         
         return preview_rgba, f"✓ Preview updated with backing color: {color_conf['slots'][backing_color_id]}"
     
@@ -3431,40 +3793,47 @@ def update_preview_with_replacements(cache, replacement_regions=None,
     mask_solid = cache['mask_solid']
     color_conf = cache['color_conf']
     backing_color_id = cache.get('backing_color_id', 0)  # Handle old cache versions
-    target_h, target_w = original_rgb.shape[:2]
-    # Start with original RGB
-    matched_rgb = original_rgb.copy()
 
-    # Apply merge map first (if provided)
-    if merge_map:
-        from core.color_merger import ColorMerger
-        from core.image_processing import LuminaImageProcessor
-
-        merger = ColorMerger(LuminaImageProcessor._rgb_to_lab)
-        matched_rgb = merger.apply_color_merging(matched_rgb, merge_map)
+    # Loop / bed events re-enter here with unchanged replacements: reuse the
+    # previously remapped image instead of re-running merge + region passes.
+    # 循环/热床等事件不改变替换参数时，直接复用上次的结果
+    signature = _replacements_signature(original_rgb, replacement_regions, merge_map)
+    if _same_replacements_signature(cache.get('_replacements_sig'), signature):
+        matched_rgb = cache['_matched_rgb_for_sig']
+    else:
+        # Start with original RGB
+        matched_rgb = original_rgb.copy()
+
+        # Apply merge map first (if provided)
+        if merge_map:
+            from core.color_merger import ColorMerger
+            from core.image_processing import LuminaImageProcessor
+
+            merger = ColorMerger(LuminaImageProcessor._rgb_to_lab)
+            matched_rgb = merger.apply_color_merging(matched_rgb, merge_map)
+
+        # Apply region replacements in-order (later items override earlier items)
+        for item in (replacement_regions or []):
+            region_mask = item.get('mask')
+            replacement_hex = item.get('replacement')
+            if region_mask is None or not replacement_hex:
+                continue
+            replacement_rgb = _hex_to_rgb_tuple(replacement_hex)
+            effective_mask = region_mask & mask_solid
+            if np.any(effective_mask):
+                matched_rgb[effective_mask] = np.array(replacement_rgb, dtype=np.uint8)
 
-    # Apply region replacements in-order (later items override earlier items)
-    for item in (replacement_regions or []):
-        region_mask = item.get('mask')
-        replacement_hex = item.get('replacement')
-        if region_mask is None or not replacement_hex:
-            continue
-        replacement_rgb = _hex_to_rgb_tuple(replacement_hex)
-        effective_mask = region_mask & mask_solid
-        if np.any(effective_mask):
-            matched_rgb[effective_mask] = np.array(replacement_rgb, dtype=np.uint8)
-    
     # Build new preview RGBA
-    preview_rgba = np.zeros((target_h, target_w, 4), dtype=np.uint8)
-    preview_rgba[mask_solid, :3] = matched_rgb[mask_solid]
-    preview_rgba[mask_solid, 3] = 255
+    preview_rgba = _build_preview_rgba(matched_rgb, mask_solid)
     
     # Update cache with new data
     updated_cache = cache.copy()
     updated_cache['matched_rgb'] = matched_rgb
-    updated_cache['preview_rgba'] = preview_rgba.copy()
+    updated_cache['preview_rgba'] = preview_rgba
     updated_cache['backing_color_id'] = backing_color_id  # Preserve backing color ID
-    
+    updated_cache['_replacements_sig'] = signature
+    updated_cache['_matched_rgb_for_sig'] = matched_rgb
+
     # Store original if not already stored
     if 'original_matched_rgb' not in updated_cache:
         updated_cache['original_matched_rgb'] = original_rgb
@@ -3515,6 +3884,100 @@ def update_preview_with_replacements(cache, replacement_regions=None,
 
 # ========== Color Highlight Functions ==========
 
+if HAS_NUMBA:
+    @numba.njit(cache=True, nogil=True)
+    def _render_highlight_numba(matched_rgb, mask_solid, highlight_mask, out_rgba):
+        height, width = mask_solid.shape
+        for y in range(height):
+            for x in range(width):
+                if highlight_mask[y, x]:
+                    out_rgba[y, x, 0] = matched_rgb[y, x, 0]
+                    out_rgba[y, x, 1] = matched_rgb[y, x, 1]
+                    out_rgba[y, x, 2] = matched_rgb[y, x, 2]
+                    out_rgba[y, x, 3] = 255
+                elif mask_solid[y, x]:
+                    gray = (np.int32(matched_rgb[y, x, 0]) + np.int32(matched_rgb[y, x, 1])
+                            + np.int32(matched_rgb[y, x, 2])) // 3
+                    dimmed = (2 * gray + 400) // 5
+                    out_rgba[y, x, 0] = dimmed
+                    out_rgba[y, x, 1] = dimmed
+                    out_rgba[y, x, 2] = dimmed
+                    out_rgba[y, x, 3] = 180
+                else:
+                    out_rgba[y, x, 0] = 0
+                    out_rgba[y, x, 1] = 0
+                    out_rgba[y, x, 2] = 0
+                    out_rgba[y, x, 3] = 0
+else:
+    _render_highlight_numba = None
+
+
+def _render_highlight(matched_rgb, mask_solid, highlight_mask, out_rgba):
+    """Fill every pixel of the highlight preview ``out_rgba``.
+
+    Highlighted pixels keep their colour at full opacity, other solid pixels
+    become dimmed grey (``mean * 0.4 + 80``, alpha 180) and the rest is
+    cleared. With numba this is a single fused pass; the dim factor is then
+    evaluated exactly in integers as ``(2 * gray + 400) // 5``.
+    """
+    if _render_highlight_numba is not None:
+        _render_highlight_numba(
+            np.ascontiguousarray(matched_rgb, dtype=np.uint8),
+            mask_solid, highlight_mask, out_rgba
+        )
+        return
+
+    out_rgba[...] = 0
+
+    # For non-highlighted solid pixels: convert to grayscale and dim
+    non_highlight_mask = mask_solid & ~highlight_mask
+    if np.any(non_highlight_mask):
+        # Convert to grayscale
+        gray_values = np.mean(matched_rgb[non_highlight_mask], axis=1).astype(np.uint8)
+        # Apply dimming (mix with darker gray)
+        dimmed_gray = (gray_values * 0.4 + 80).astype(np.uint8)
+        # One (K, 4) scatter instead of four per-channel masked writes
+        dimmed = np.empty((dimmed_gray.size, 4), dtype=np.uint8)
+        dimmed[:, :3] = dimmed_gray[:, None]
+        dimmed[:, 3] = 180  # Semi-transparent
+        out_rgba[non_highlight_mask] = dimmed
+
+    # For highlighted pixels: show original color with full opacity
+    out_rgba[highlight_mask, :3] = matched_rgb[highlight_mask]
+    out_rgba[highlight_mask, 3] = 255
+
+
+_HIGHLIGHT_BORDER_MEMO_SIZE = 16
+
+
+def _get_highlight_border(cache, key, highlight_mask, matched_rgb, mask_solid, region_mask):
+    """Return the cyan border ring around ``highlight_mask``, memoized per color.
+
+    The ring depends only on the highlighted color/scope and the cached
+    images, so re-rendering the same highlight (loop drag, bed change,
+    flipping back to a color) skips the dilation. The memo belongs to one
+    ``matched_rgb``/``mask_solid`` pair and is dropped whole when either is
+    replaced, so stale full-frame rings are not kept alive.
+    """
+    memo = cache.get('highlight_border')
+    if memo is None or memo[0] is not matched_rgb or memo[1] is not mask_solid:
+        memo = (matched_rgb, mask_solid, {})
+        cache['highlight_border'] = memo
+    entries = memo[2]
+    entry = entries.get(key)
+    if entry is not None and entry[0] is region_mask:
+        return entry[1]
+
+    kernel = np.ones((5, 5), np.uint8)
+    dilated = cv2.dilate(highlight_mask.astype(np.uint8), kernel, iterations=2)
+    border_mask = (dilated > 0) & ~highlight_mask & mask_solid
+
+    if key not in entries and len(entries) >= _HIGHLIGHT_BORDER_MEMO_SIZE:
+        entries.pop(next(iter(entries)))
+    entries[key] = (region_mask, border_mask)
+    return border_mask
+
+
 def generate_highlight_preview(cache, highlight_color: str, 
                                loop_pos=None, add_loop=False,
                                loop_width=4, loop_length=8, 
@@ -3564,12 +4027,9 @@ def generate_highlight_preview(cache, highlight_color: str,
     if not highlight_hex.startswith('#'):
         highlight_hex = '#' + highlight_hex
     
-    # Convert hex to RGB
+    # Convert hex to packed RGB key
     try:
-        r = int(highlight_hex[1:3], 16)
-        g = int(highlight_hex[3:5], 16)
-        b = int(highlight_hex[5:7], 16)
-        highlight_rgb = np.array([r, g, b], dtype=np.uint8)
+        highlight_key = _hex_to_packed_key(highlight_hex)
     except (ValueError, IndexError):
         return None, f"[ERROR] 无效的颜色值 | Invalid color: {highlight_color}"
     
@@ -3584,7 +4044,8 @@ def generate_highlight_preview(cache, highlight_color: str,
     target_h, target_w = matched_rgb.shape[:2]
     
     # Create highlight mask - pixels matching the highlight color
-    color_match = np.all(matched_rgb == highlight_rgb, axis=2)
+    # (one scalar compare against the packed uint32 image)
+    color_match = _get_matched_packed(cache) == highlight_key
 
     scope = cache.get('selection_scope', 'global')
     region_mask = cache.get('selected_region_mask')
@@ -3606,38 +4067,21 @@ def generate_highlight_preview(cache, highlight_color: str,
     
     # Create highlighted preview
     # Option 1: Dim non-highlighted areas (grayscale + reduced opacity)
-    preview_rgba = np.zeros((target_h, target_w, 4), dtype=np.uint8)
-    
-    # For non-highlighted solid pixels: convert to grayscale and dim
-    non_highlight_mask = mask_solid & ~highlight_mask
-    if np.any(non_highlight_mask):
-        # Convert to grayscale
-        gray_values = np.mean(matched_rgb[non_highlight_mask], axis=1).astype(np.uint8)
-        # Apply dimming (mix with darker gray)
-        dimmed_gray = (gray_values * 0.4 + 80).astype(np.uint8)
-        preview_rgba[non_highlight_mask, 0] = dimmed_gray
-        preview_rgba[non_highlight_mask, 1] = dimmed_gray
-        preview_rgba[non_highlight_mask, 2] = dimmed_gray
-        preview_rgba[non_highlight_mask, 3] = 180  # Semi-transparent
-    
-    # For highlighted pixels: show original color with full opacity
-    preview_rgba[highlight_mask, :3] = matched_rgb[highlight_mask]
-    preview_rgba[highlight_mask, 3] = 255
+    # Highlighted pixels keep their color, other solid pixels are grayed and dimmed
+    # (_render_highlight writes every pixel, so the buffer needs no zeroing)
+    preview_rgba = np.empty((target_h, target_w, 4), dtype=np.uint8)
+    _render_highlight(matched_rgb, mask_solid, highlight_mask, preview_rgba)
     
     # Add a subtle colored border/glow effect around highlighted regions
     # by dilating the highlight mask and drawing a border
     try:
-        import cv2
-        kernel = np.ones((5, 5), np.uint8)
-        dilated = cv2.dilate(highlight_mask.astype(np.uint8), kernel, iterations=2)
-        border_mask = (dilated > 0) & ~highlight_mask & mask_solid
+        border_mask = _get_highlight_border(
+            cache, (highlight_key, scope), highlight_mask, matched_rgb, mask_solid, region_mask
+        )
         
         # Draw border in a contrasting color (cyan for visibility)
         if np.any(border_mask):
-            preview_rgba[border_mask, 0] = 0    # R
-            preview_rgba[border_mask, 1] = 255  # G
-            preview_rgba[border_mask, 2] = 255  # B
-            preview_rgba[border_mask, 3] = 200  # Alpha
+            preview_rgba[border_mask] = (0, 255, 255, 200)  # RGBA
     except Exception as e:
         print(f"[HIGHLIGHT] Border effect skipped: {e}")
     
@@ -3723,41 +4167,16 @@ def on_preview_click_select_color(cache, evt: gr.SelectData, bed_label=None):
 
     target_w = cache.get('target_w')
     target_h = cache.get('target_h')
-    target_width_mm = cache.get('target_width_mm')
 
     if target_w is None or target_h is None:
         return gr.update(), "未选择", None, "[ERROR] 缓存数据不完整"
 
-    bed_w_mm, bed_h_mm = BedManager.get_bed_size(bed_label)
-    ppm = BedManager.compute_scale(bed_w_mm, bed_h_mm)
-    margin = int(30 * ppm / 3)
+    offset_x, offset_y, px_scale, _, gradio_scale = _click_calibration(cache, bed_label)
 
-    canvas_w = int(bed_w_mm * ppm) + margin
-    canvas_h = int(bed_h_mm * ppm) + margin
-
-    # Use target_width_mm from cache for accurate physical size
-    if target_width_mm is not None and target_width_mm > 0:
-        model_w_mm = target_width_mm
-        model_h_mm = target_width_mm * target_h / target_w
-    else:
-        model_w_mm = target_w * PrinterConfig.NOZZLE_WIDTH
-        model_h_mm = target_h * PrinterConfig.NOZZLE_WIDTH
-    new_w = max(1, int(model_w_mm * ppm))
-    new_h = max(1, int(model_h_mm * ppm))
-
-    offset_x = margin + (int(bed_w_mm * ppm) - new_w) // 2
-    offset_y = (int(bed_h_mm * ppm) - new_h) // 2
-
-    # _scale_preview_image fits canvas into 1200×750 box
-    gradio_scale = min(1.0, 1200 / canvas_w, 750 / canvas_h)
-
-    canvas_click_x = display_click_x / gradio_scale
-    canvas_click_y = display_click_y / gradio_scale
-
-    # Convert canvas coords → original image pixel coords
-    mm_per_px = model_w_mm / target_w
-    img_px_x = (canvas_click_x - offset_x) / (mm_per_px * ppm)
-    img_px_y = (canvas_click_y - offset_y) / (mm_per_px * ppm)
+    # _scale_preview_image fits canvas into 1200×750 box;
+    # convert canvas coords → original image pixel coords
+    img_px_x = (display_click_x / gradio_scale - offset_x) / px_scale
+    img_px_y = (display_click_y / gradio_scale - offset_y) / px_scale
 
     orig_x = int(img_px_x)
     orig_y = int(img_px_y)
@@ -3806,40 +4225,150 @@ def on_preview_click_select_color(cache, evt: gr.SelectData, bed_label=None):
     return display_img, display_text, q_hex, status_msg
 
 
+_HUE_CATEGORIES = ('neutral', 'red', 'orange', 'yellow', 'green', 'cyan', 'blue', 'purple')
+
+
+if HAS_NUMBA:
+    @numba.guvectorize(["void(u1[:], i8[:])"], "(n)->()", nopython=True, cache=True)
+    def _classify_hue_idx_numba(rgb, out):
+        # Same arithmetic as colorsys.rgb_to_hsv, one triplet at a time
+        r = rgb[0] / 255.0
+        g = rgb[1] / 255.0
+        b = rgb[2] / 255.0
+        maxc = max(r, g, b)
+        minc = min(r, g, b)
+        if maxc == minc:
+            out[0] = 0
+            return
+        rangec = maxc - minc
+        if rangec / maxc < 0.15 or maxc < 0.10:
+            out[0] = 0
+            return
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+        if r == maxc:
+            h = bc - gc
+        elif g == maxc:
+            h = 2.0 + rc - bc
+        else:
+            h = 4.0 + gc - rc
+        h360 = ((h / 6.0) % 1.0) * 360
+        if h360 < 15 or h360 >= 345:
+            out[0] = 1
+        elif h360 < 40:
+            out[0] = 2
+        elif h360 < 70:
+            out[0] = 3
+        elif h360 < 160:
+            out[0] = 4
+        elif h360 < 195:
+            out[0] = 5
+        elif h360 < 260:
+            out[0] = 6
+        else:
+            out[0] = 7
+else:
+    _classify_hue_idx_numba = None
+
+
+def _classify_hues(rgb):
+    """Classify an (N, 3) RGB array into hue-filter categories in one pass.
+
+    Vectorized equivalent of ``colorsys.rgb_to_hsv`` followed by the hue
+    thresholds used by the LUT grid filter bar. With numba each triplet is
+    classified by a gufunc without temporaries; otherwise ``np.select``.
+
+    Returns:
+        list[str]: One of _HUE_CATEGORIES per color.
+    """
+    if _classify_hue_idx_numba is not None:
+        idx = _classify_hue_idx_numba(np.asarray(rgb, dtype=np.uint8).reshape(-1, 3))
+        return [_HUE_CATEGORIES[i] for i in idx]
+
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    chromatic = delta > 0
+    safe_delta = np.where(chromatic, delta, 1.0)
+    s = np.where(chromatic, delta / np.where(maxc > 0, maxc, 1.0), 0.0)
+    rc = (maxc - r) / safe_delta
+    gc = (maxc - g) / safe_delta
+    bc = (maxc - b) / safe_delta
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h360 = np.where(chromatic, (h / 6.0) % 1.0, 0.0) * 360
+
+    conditions = [
+        (s < 0.15) | (maxc < 0.10),
+        (h360 < 15) | (h360 >= 345),
+        h360 < 40,
+        h360 < 70,
+        h360 < 160,
+        h360 < 195,
+        h360 < 260,
+        h360 < 345,
+    ]
+    idx = np.select(conditions, np.arange(len(_HUE_CATEGORIES)), default=0)
+    return [_HUE_CATEGORIES[i] for i in idx]
+
+
+def warmup_preview_kernels():
+    """Compile the numba preview kernels ahead of the first interaction.
+
+    Calls every kernel once on tiny inputs with the dtypes used at runtime,
+    so the JIT (or on-disk cache load) cost is paid at app start instead of
+    on the first highlight / backing / 3D preview click. Safe to run in a
+    background thread; a no-op without numba.
+
+    Returns:
+        bool: True if kernels were compiled, False if numba is unavailable.
+    """
+    if not HAS_NUMBA:
+        return False
+
+    t0 = time.time()
+    mask = np.ones((2, 2), dtype=np.bool_)
+    rgb = np.zeros((2, 2, 3), dtype=np.uint8)
+    rgba = np.zeros((2, 2, 4), dtype=np.uint8)
+    _render_highlight_numba(rgb, mask, mask, rgba)
+    for dtype in (np.int64, np.int32):
+        _apply_backing_color_numba(
+            np.full((2, 2, 5), -1, dtype=dtype), mask, rgba, 255, 255, 255
+        )
+    _build_preview_voxel_arrays(
+        mask, rgb, np.full(4, 255, dtype=np.uint8), 0, 0, 2, 0.05, False
+    )
+    _classify_hue_idx_numba(np.zeros((1, 3), dtype=np.uint8))
+    _render_card_swatches(np.zeros((1, 3), dtype=np.uint8))
+    print(f"[CONVERTER] Numba preview kernels ready ({time.time() - t0:.2f}s)")
+    return True
+
+
+# One swatch of generate_lut_grid_html (filled via str.format)
+_LUT_SWATCH_HTML = """
+        <div class="lut-color-swatch-container" data-hue="{hue}" style="display:flex;">
+        <div class="lut-swatch lut-color-swatch"
+             data-color="{hex}"
+             style="background-color: {hex}; width:24px; height:24px; cursor:pointer; border:1px solid #ddd; border-radius:3px;"
+             title="{hex} (R:{r} G:{g} B:{b})">
+        </div>
+        </div>
+        """
+
+
 def generate_lut_grid_html(lut_path, lang: str = "zh"):
     """
     生成 LUT 可用颜色的 HTML 网格 (with hue filter + smart search)
     """
-    from core.i18n import I18n
-    import colorsys
     colors = extract_lut_available_colors(lut_path)
 
     if not colors:
         return f"<div style='color:orange'>LUT 文件无效或为空</div>"
 
     count = len(colors)
-
-    def _classify_hue(r, g, b):
-        rf, gf, bf = r / 255.0, g / 255.0, b / 255.0
-        h, s, v = colorsys.rgb_to_hsv(rf, gf, bf)
-        h360 = h * 360
-        if s < 0.15 or v < 0.10:
-            return 'neutral'
-        if h360 < 15 or h360 >= 345:
-            return 'red'
-        elif h360 < 40:
-            return 'orange'
-        elif h360 < 70:
-            return 'yellow'
-        elif h360 < 160:
-            return 'green'
-        elif h360 < 195:
-            return 'cyan'
-        elif h360 < 260:
-            return 'blue'
-        elif h360 < 345:
-            return 'purple'
-        return 'neutral'
+    hue_cats = _classify_hues([entry['color'] for entry in colors])
 
     from ui.palette_extension import build_search_bar_html, build_hue_filter_bar_html
 
@@ -3865,27 +4394,124 @@ def generate_lut_grid_html(lut_path, lang: str = "zh"):
             background: #f9f9f9;">
     """
 
-    for entry in colors:
-        hex_val = entry['hex']
+    parts = [html]
+    for entry, hue_cat in zip(colors, hue_cats):
         r, g, b = entry['color']
-        rgb_val = f"R:{r} G:{g} B:{b}"
-        hue_cat = _classify_hue(r, g, b)
-
-        html += f"""
-        <div class="lut-color-swatch-container" data-hue="{hue_cat}" style="display:flex;">
-        <div class="lut-swatch lut-color-swatch"
-             data-color="{hex_val}"
-             style="background-color: {hex_val}; width:24px; height:24px; cursor:pointer; border:1px solid #ddd; border-radius:3px;"
-             title="{hex_val} ({rgb_val})">
-        </div>
-        </div>
-        """
+        parts.append(_LUT_SWATCH_HTML.format(
+            hue=hue_cat, hex=entry['hex'], r=r, g=g, b=b
+        ))
+    parts.append("</div></div>")
+    return "".join(parts)
+
+
+def _square_grid_dim(n):
+    """Smallest side length d with d * d >= n (integer ceil-sqrt)."""
+    return math.isqrt(n - 1) + 1 if n > 0 else 0
+
+
+# One swatch of generate_lut_card_grid_html (filled via %-formatting)
+# (shared size/shape lives in _CARD_SWATCH_CSS, emitted once per grid)
+_CARD_SWATCH_TMPL = (
+    "<div class='lut-swatch lut-color-swatch lut-swatch-cell' data-color='%s' data-hue='%s' "
+    "style='background:%s' title='%s (R:%d G:%d B:%d)'></div>"
+)
+# Opening markup of one card: title (count) + square swatch grid
+_CARD_OPEN_TMPL = (
+    "<div style='flex-shrink:0;'>"
+    "<div style='font-size:11px; color:#666; margin-bottom:4px;'>%s (%d)</div>"
+    "<div style='display:grid; grid-template-columns:repeat(%d, %dpx); gap:%dpx; "
+    "border:1px solid #eee; border-radius:6px; padding:4px; background:#f9f9f9;'>"
+)
+# Two-class selector so it outranks the global .lut-swatch rule (24px)
+_CARD_SWATCH_CSS = (
+    "<style>.lut-swatch.lut-swatch-cell{width:%dpx;height:%dpx;"
+    "cursor:pointer;border-radius:2px;}</style>"
+)
+
+# Byte tables for the compiled swatch emitter: the literal pieces of
+# _CARD_SWATCH_TMPL between its 7 fields, and the hue names, each packed
+# into one uint8 array with start offsets
+_CARD_SWATCH_LITERALS = [_CARD_SWATCH_TMPL.split('%')[0]] + [
+    piece[1:] for piece in _CARD_SWATCH_TMPL.split('%')[1:]
+]
+_CARD_SWATCH_LIT = np.frombuffer("".join(_CARD_SWATCH_LITERALS).encode('ascii'), dtype=np.uint8)
+_CARD_SWATCH_LIT_OFF = np.cumsum([0] + [len(p) for p in _CARD_SWATCH_LITERALS]).astype(np.int64)
+_HUE_LIT = np.frombuffer("".join(_HUE_CATEGORIES).encode('ascii'), dtype=np.uint8)
+_HUE_LIT_OFF = np.cumsum([0] + [len(h) for h in _HUE_CATEGORIES]).astype(np.int64)
+# Upper bound of one emitted swatch: literals + 3 x '#rrggbb' + hue + 3 x 3 digits
+_CARD_SWATCH_MAX_LEN = len(_CARD_SWATCH_LIT) + 3 * 7 + max(map(len, _HUE_CATEGORIES)) + 9
+
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, nogil=True)
+    def _emit_card_swatches_numba(rgb, hue_idx, lit, lit_off, hue_lit, hue_off, out):
+        # Writes _CARD_SWATCH_TMPL for every color as ASCII bytes into out;
+        # returns the number of bytes written
+        pos = 0
+        for i in range(rgb.shape[0]):
+            for f in range(8):
+                for k in range(lit_off[f], lit_off[f + 1]):
+                    out[pos] = lit[k]
+                    pos += 1
+                if f == 7:
+                    break
+                if f == 1:
+                    h = hue_idx[i]
+                    for k in range(hue_off[h], hue_off[h + 1]):
+                        out[pos] = hue_lit[k]
+                        pos += 1
+                elif f < 4:
+                    # '#rrggbb' (fields 0, 2, 3)
+                    out[pos] = 35
+                    pos += 1
+                    for c in range(3):
+                        v = rgb[i, c]
+                        hi = v >> 4
+                        lo = v & 15
+                        out[pos] = hi + 48 if hi < 10 else hi + 87
+                        out[pos + 1] = lo + 48 if lo < 10 else lo + 87
+                        pos += 2
+                else:
+                    # Decimal channel value (fields 4, 5, 6)
+                    v = rgb[i, f - 4]
+                    if v >= 100:
+                        out[pos] = v // 100 + 48
+                        pos += 1
+                    if v >= 10:
+                        out[pos] = (v // 10) % 10 + 48
+                        pos += 1
+                    out[pos] = v % 10 + 48
+                    pos += 1
+        return pos
+else:
+    _emit_card_swatches_numba = None
+
+
+def _render_card_swatches(colors_arr):
+    """Render every swatch of one card as a single HTML string.
+
+    With numba the markup is emitted as raw bytes by a compiled loop (hue
+    classes as small ints, hex digits from nibbles) and decoded once;
+    otherwise each swatch is %-formatted from _CARD_SWATCH_TMPL.
+    """
+    rgb = np.ascontiguousarray(colors_arr, dtype=np.uint8).reshape(-1, 3)
+    if _emit_card_swatches_numba is not None:
+        hue_idx = _classify_hue_idx_numba(rgb)
+        out = np.empty(len(rgb) * _CARD_SWATCH_MAX_LEN, dtype=np.uint8)
+        n = _emit_card_swatches_numba(
+            rgb, hue_idx, _CARD_SWATCH_LIT, _CARD_SWATCH_LIT_OFF, _HUE_LIT, _HUE_LIT_OFF, out
+        )
+        return out[:n].tobytes().decode('ascii')
 
-    html += "</div></div>"
-    return html
+    # tolist() unboxes all channels to Python ints in one C call
+    rgb_list = rgb.astype(np.int64).tolist()
+    return "".join([
+        _CARD_SWATCH_TMPL % (hex_val, hue_cat, hex_val, hex_val, r, g, b)
+        for (r, g, b), hue_cat, hex_val in zip(rgb_list, _classify_hues(rgb), _rgb_to_hex_list(rgb))
+    ])
 
 
-def generate_lut_card_grid_html(lut_path, lang: str = "zh"):
+def generate_lut_card_grid_html(lut_path, lang: str = "zh", dedupe: bool = False):
     """
     Generate a calibration-card-style (色卡) HTML grid for the LUT.
 
@@ -3898,10 +4524,31 @@ def generate_lut_card_grid_html(lut_path, lang: str = "zh"):
 
     Each swatch is clickable (same data-color / class as the swatch grid) so
     the existing event-delegation click handler picks it up automatically.
+
+    With ``dedupe=True`` repeated colors within a card are emitted once (first
+    occurrence, LUT order kept), shrinking the DOM for noisy LUTs at the cost
+    of the 1:1 board layout.
+
+    The HTML is deterministic per file version, so it is memoized by
+    (path, mtime, size, lang, dedupe); rewriting the LUT invalidates it.
     """
     if not lut_path:
         return "<div style='color:orange'>LUT 文件无效或为空</div>"
 
+    try:
+        st = os.stat(lut_path)
+    except (OSError, TypeError, ValueError):
+        return _render_lut_card_grid_html(lut_path, lang, dedupe)
+    return _render_lut_card_grid_html_cached(lut_path, st.st_mtime_ns, st.st_size, lang, dedupe)
+
+
+@functools.lru_cache(maxsize=8)
+def _render_lut_card_grid_html_cached(lut_path, mtime_ns, size, lang, dedupe):
+    return _render_lut_card_grid_html(lut_path, lang, dedupe)
+
+
+def _render_lut_card_grid_html(lut_path, lang, dedupe):
+    """Body of generate_lut_card_grid_html (uncached)."""
     try:
         lut_grid = np.load(lut_path)
         measured_colors = lut_grid.reshape(-1, 3)
@@ -3910,91 +4557,112 @@ def generate_lut_card_grid_html(lut_path, lang: str = "zh"):
 
     total = len(measured_colors)
 
-    from core.i18n import I18n
-    import colorsys
-
-    def _classify_hue(r, g, b):
-        rf, gf, bf = r / 255.0, g / 255.0, b / 255.0
-        h, s, v = colorsys.rgb_to_hsv(rf, gf, bf)
-        h360 = h * 360
-        if s < 0.15 or v < 0.10:
-            return 'neutral'
-        if h360 < 15 or h360 >= 345:
-            return 'red'
-        elif h360 < 40:
-            return 'orange'
-        elif h360 < 70:
-            return 'yellow'
-        elif h360 < 160:
-            return 'green'
-        elif h360 < 195:
-            return 'cyan'
-        elif h360 < 260:
-            return 'blue'
-        elif h360 < 345:
-            return 'purple'
-        return 'neutral'
-
-    import math
-    if total == 2738:
+    # 8-color LUTs (2 physical boards) are split into two cards; keyed on the
+    # 8-color size bucket so near-2738 LUTs keep the two-card layout
+    if _lut_mode_for_count(total) == "8-Color Max":
         half = total // 2
-        remainder = total - half
-        dim1 = int(math.ceil(math.sqrt(half)))
-        dim2 = int(math.ceil(math.sqrt(remainder)))
+        dim1 = _square_grid_dim(half)
+        dim2 = _square_grid_dim(total - half)
         grids = [
             (measured_colors[:half], dim1, "色卡 A" if lang == "zh" else "Card A"),
             (measured_colors[half:], dim2, "色卡 B" if lang == "zh" else "Card B"),
         ]
     else:
-        dim = int(math.ceil(math.sqrt(total)))
+        dim = _square_grid_dim(total)
         label = f"{total} 色色卡" if lang == "zh" else f"{total}-color Card"
         grids = [(measured_colors, dim, label)]
 
+    if dedupe:
+        deduped = []
+        for colors_arr, _, title in grids:
+            _, first_idx = np.unique(_pack_rgb(colors_arr), return_index=True)
+            colors_arr = colors_arr[np.sort(first_idx)]
+            deduped.append((colors_arr, _square_grid_dim(len(colors_arr)), title))
+        grids = deduped
+        total = sum(len(colors_arr) for colors_arr, _, _ in grids)
+
     cell = 18
     gap = 1
 
+    # Lazy: importing the ui package pulls in ui.layout_new, which imports
+    # this module (circular at load time)
     from ui.palette_extension import build_search_bar_html, build_hue_filter_bar_html
 
-    html_parts = [
-        f'<div style="margin-bottom:8px; font-size:12px; color:#666;">{I18n.get("lut_grid_count", lang).format(count=total)}: <span id="lut-color-visible-count">{total}</span></div>',
-        build_search_bar_html(lang),
-        build_hue_filter_bar_html(lang),
-    ]
+    buf = io.StringIO()
+    write = buf.write
+    write(_CARD_SWATCH_CSS % (cell, cell))
+    write(f'<div style="margin-bottom:8px; font-size:12px; color:#666;">{I18n.get("lut_grid_count", lang).format(count=total)}: <span id="lut-color-visible-count">{total}</span></div>')
+    write(build_search_bar_html(lang))
+    write(build_hue_filter_bar_html(lang))
 
     # Derive LUT key for favorites persistence
     _lut_key = os.path.splitext(os.path.basename(lut_path))[0] if lut_path else ''
 
     # Grid
-    html_parts.append(
+    write(
         f"<div id='lut-color-grid-container' data-lut-key='{_lut_key}' style='display:flex; gap:12px; align-items:flex-start; "
         "overflow-x:auto; padding:4px;'>"
     )
 
     for colors_arr, dim, title in grids:
-        html_parts.append(
-            f"<div style='flex-shrink:0;'>"
-            f"<div style='font-size:11px; color:#666; margin-bottom:4px;'>{title} ({len(colors_arr)})</div>"
-            f"<div style='display:grid; grid-template-columns:repeat({dim}, {cell}px); gap:{gap}px; "
-            f"border:1px solid #eee; border-radius:6px; padding:4px; background:#f9f9f9;'>"
-        )
-        for c in colors_arr:
-            r, g, b = int(c[0]), int(c[1]), int(c[2])
-            hex_val = f"#{r:02x}{g:02x}{b:02x}"
-            hue_cat = _classify_hue(r, g, b)
-            html_parts.append(
-                f"<div class='lut-swatch lut-color-swatch' data-color='{hex_val}' data-hue='{hue_cat}' "
-                f"style='width:{cell}px;height:{cell}px;background:{hex_val};"
-                f"cursor:pointer;border-radius:2px;' "
-                f"title='{hex_val} (R:{r} G:{g} B:{b})'></div>"
-            )
-        html_parts.append("</div></div>")
+        write(_CARD_OPEN_TMPL % (title, len(colors_arr), dim, cell, gap))
+        write(_render_card_swatches(colors_arr))
+        write("</div></div>")
 
-    html_parts.append("</div>")
-    return "".join(html_parts)
+    write("</div>")
+    return buf.getvalue()
 
 
 # ========== Auto-detection Functions ==========
 
+def _read_npy_shape(path):
+    """Read the array shape from a .npy header without loading the data."""
+    from numpy.lib import format as npy_format
+
+    with open(path, 'rb') as f:
+        version = npy_format.read_magic(f)
+        if version == (1, 0):
+            shape, _, _ = npy_format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, _, _ = npy_format.read_array_header_2_0(f)
+        else:
+            return np.load(path, mmap_mode='r').shape
+    return shape
+
+
+# LUT color-count buckets as half-open [lo, hi) ranges, sorted by lo:
+# 2色 32 / 4色 1024 / 6色 1296 / 5色扩展 ~2468 / 8色 2738
+_LUT_COLOR_BUCKETS = (
+    (30, 36, "BW (Black & White)"),
+    (900, 1200, "4-Color"),
+    (1200, 1400, "6-Color (Smart 1296)"),
+    (2400, 2600, "5-Color Extended"),
+    (2600, 2801, "8-Color Max"),
+)
+_LUT_COLOR_BUCKET_LOWS = tuple(lo for lo, _, _ in _LUT_COLOR_BUCKETS)
+
+
+# Nominal sizes of the stock calibration boards: O(1) hit before the bisect
+_EXACT_LUT_SIZES = {
+    32: "BW (Black & White)",
+    1024: "4-Color",
+    1296: "6-Color (Smart 1296)",
+    2468: "5-Color Extended",
+    2738: "8-Color Max",
+}
+
+
+def _lut_mode_for_count(total_colors):
+    """Map a LUT color count to its color mode, or None if non-standard."""
+    mode = _EXACT_LUT_SIZES.get(total_colors)
+    if mode is not None:
+        return mode
+    i = bisect.bisect_right(_LUT_COLOR_BUCKET_LOWS, total_colors) - 1
+    if i >= 0 and total_colors < _LUT_COLOR_BUCKETS[i][1]:
+        return _LUT_COLOR_BUCKETS[i][2]
+    return None
+
+
 def detect_lut_color_mode(lut_path):
     """
     自动检测LUT文件的颜色模式
@@ -4007,7 +4675,20 @@ def detect_lut_color_mode(lut_path):
     """
     if not lut_path or not os.path.exists(lut_path):
         return None
-    
+
+    try:
+        st = os.stat(lut_path)
+    except OSError:
+        return None
+    return _detect_lut_color_mode_cached(lut_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=64)
+def _detect_lut_color_mode_cached(lut_path, mtime_ns, size):
+    """detect_lut_color_mode body, memoized per (path, mtime, size).
+
+    Rewriting the file changes mtime/size, so stale entries are never hit.
+    """
     try:
         if lut_path.endswith('.npz'):
             data = np.load(lut_path)
@@ -4017,78 +4698,48 @@ def detect_lut_color_mode(lut_path):
                 stacks = data['stacks'] if 'stacks' in data else None
                 layer_count = int(stacks.shape[1]) if isinstance(stacks, np.ndarray) and stacks.ndim == 2 else None
                 max_mat = int(np.max(stacks)) if isinstance(stacks, np.ndarray) and stacks.size > 0 else None
-                if total_colors >= 2400 and total_colors < 2600 and layer_count == 6 and (max_mat is None or max_mat <= 4):
-                    print(f"[AUTO_DETECT] Detected 5-Color Extended mode from .npz ({total_colors} colors)")
-                    return "5-Color Extended"
-                if total_colors >= 2600 and total_colors <= 2800:
-                    print(f"[AUTO_DETECT] Detected 8-Color mode from .npz ({total_colors} colors)")
-                    return "8-Color Max"
-                if total_colors >= 1200 and total_colors < 1400:
-                    print(f"[AUTO_DETECT] Detected 6-Color mode from .npz ({total_colors} colors)")
-                    return "6-Color (Smart 1296)"
-                if total_colors >= 900 and total_colors < 1200:
-                    print(f"[AUTO_DETECT] Detected 4-Color mode from .npz ({total_colors} colors)")
-                    return "4-Color"
-                if total_colors >= 30 and total_colors <= 35:
-                    print(f"[AUTO_DETECT] Detected 2-Color BW mode from .npz ({total_colors} colors)")
-                    return "BW (Black & White)"
-            print(f"[AUTO_DETECT] Detected Merged LUT (.npz format)")
+                mode = _lut_mode_for_count(total_colors)
+                # 5-Color Extended needs 6-layer stacks of materials 0-4
+                if mode == "5-Color Extended" and not (
+                        layer_count == 6 and (max_mat is None or max_mat <= 4)):
+                    mode = None
+                if mode is not None:
+                    logger.debug("[AUTO_DETECT] Detected %s mode from .npz (%d colors)", mode, total_colors)
+                    return mode
+            logger.debug("[AUTO_DETECT] Detected Merged LUT (.npz format)")
             return "Merged"
         
-        # Standard .npy format
-        lut_data = np.load(lut_path)
+        # Standard .npy format: only the header is read, the shape is all we need
+        shape = _read_npy_shape(lut_path)
         
         # 确保是2D数组
-        if lut_data.ndim == 1:
+        if len(shape) == 1:
             # 如果是1D数组，假设是 (N*3,) 格式，重塑为 (N, 3)
-            if len(lut_data) % 3 == 0:
-                lut_data = lut_data.reshape(-1, 3)
+            if shape[0] % 3 == 0:
+                shape = (shape[0] // 3, 3)
             else:
-                print(f"[AUTO_DETECT] Invalid LUT format: cannot reshape to (N, 3)")
+                logger.debug("[AUTO_DETECT] Invalid LUT format: cannot reshape to (N, 3)")
                 return None
         
         # 计算颜色数量
-        if lut_data.ndim == 2:
-            total_colors = lut_data.shape[0]
+        if len(shape) == 2:
+            total_colors = shape[0]
         else:
-            total_colors = lut_data.shape[0] * lut_data.shape[1]
-        
-        print(f"[AUTO_DETECT] LUT shape: {lut_data.shape}, total colors: {total_colors}")
-        
-        # 2色模式：32色 (2^5 = 32)
-        if total_colors >= 30 and total_colors <= 35:
-            print(f"[AUTO_DETECT] Detected 2-Color BW mode (32 colors)")
-            return "BW (Black & White)"
-        
-        # 5-Color Extended模式：~2468色 (1024 base + 1444 extended)
-        elif total_colors >= 2400 and total_colors < 2600:
-            print(f"[AUTO_DETECT] Detected 5-Color Extended mode ({total_colors} colors)")
-            return "5-Color Extended"
+            total_colors = shape[0] * shape[1]
         
-        # 8色模式：2600-2800色
-        elif total_colors >= 2600 and total_colors <= 2800:
-            print(f"[AUTO_DETECT] Detected 8-Color mode ({total_colors} colors)")
-            return "8-Color Max"
+        logger.debug("[AUTO_DETECT] LUT shape: %s, total colors: %d", shape, total_colors)
         
-        # 6色模式：1200-1400色
-        elif total_colors >= 1200 and total_colors < 1400:
-            print(f"[AUTO_DETECT] Detected 6-Color mode ({total_colors} colors)")
-            return "6-Color (Smart 1296)"
-        
-        # 4色模式：900-1200色
-        elif total_colors >= 900 and total_colors < 1200:
-            print(f"[AUTO_DETECT] Detected 4-Color mode ({total_colors} colors)")
-            return "4-Color"
-        
-        else:
-            # 非标准尺寸：识别为合并色卡
-            print(f"[AUTO_DETECT] Non-standard LUT size ({total_colors} colors), detected as Merged")
-            return "Merged"
+        mode = _lut_mode_for_count(total_colors)
+        if mode is not None:
+            logger.debug("[AUTO_DETECT] Detected %s mode (%d colors)", mode, total_colors)
+            return mode
+
+        # 非标准尺寸：识别为合并色卡
+        logger.debug("[AUTO_DETECT] Non-standard LUT size (%d colors), detected as Merged", total_colors)
+        return "Merged"
             
-    except Exception as e:
-        print(f"[AUTO_DETECT] Error detecting LUT mode: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("[AUTO_DETECT] Error detecting LUT mode")
         return None
 
 
@@ -4111,12 +4762,12 @@ def detect_image_type(image_path):
         ext = os.path.splitext(image_path)[1].lower()
         
         if ext == '.svg':
-            print(f"[AUTO_DETECT] SVG file detected, recommending SVG Mode")
+            logger.debug("[AUTO_DETECT] SVG file detected, recommending SVG Mode")
             return gr.update(value=ModelingMode.VECTOR)
         else:
-            print(f"[AUTO_DETECT] Raster image detected ({ext}), keeping current mode")
+            logger.debug("[AUTO_DETECT] Raster image detected (%s), keeping current mode", ext)
             return gr.update()  # 不改变当前选择
             
-    except Exception as e:
-        print(f"[AUTO_DETECT] Error detecting image type: {e}")
+    except Exception:
+        logger.exception("[AUTO_DETECT] Error detecting image type")
         return None
@@ -5,6 +5,7 @@ Extracts color data from printed calibration boards.
 """
 
 import os
+from functools import lru_cache
 import numpy as np
 import cv2
 import gradio as gr
@@ -20,26 +21,53 @@ from config import (
 from utils import Stats
 
 
+# Path -> (st_mtime_ns, st_size, read-only LUT). Lets repeated probe/fix
+# clicks skip np.load; a new mtime/size on disk invalidates the entry.
+_LUT_CACHE = {}
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_lut(path):
+    """Return the LUT at path as a shared read-only array (copy before editing)."""
+    key = os.path.abspath(path)
+    mtime_ns, size = _stat_key(path)
+    cached = _LUT_CACHE.get(key)
+    if cached is not None and cached[:2] == (mtime_ns, size):
+        return cached[2]
+    lut = np.load(path)
+    lut.setflags(write=False)
+    _LUT_CACHE[key] = (mtime_ns, size, lut)
+    return lut
+
+
+def _store_lut(path, lut):
+    """Save lut to path and make it the cached copy for that path."""
+    np.save(path, lut)
+    lut = lut.copy()
+    lut.setflags(write=False)
+    _LUT_CACHE[os.path.abspath(path)] = (*_stat_key(path), lut)
+
+
 def generate_simulated_reference():
     """Generate reference image for visual comparison."""
-    colors = {
-        0: np.array([250, 250, 250]),
-        1: np.array([220, 20, 60]),
-        2: np.array([255, 230, 0]),
-        3: np.array([0, 100, 240])
-    }
-
-    ref_img = np.zeros((DATA_GRID_SIZE, DATA_GRID_SIZE, 3), dtype=np.uint8)
-    for i in range(1024):
-        digits = []
-        temp = i
-        for _ in range(5):
-            digits.append(temp % 4)
-            temp //= 4
-        stack = digits[::-1]
-
-        mixed = sum(colors[mid] for mid in stack) / 5.0
-        ref_img[i // DATA_GRID_SIZE, i % DATA_GRID_SIZE] = mixed.astype(np.uint8)
+    colors = np.array([
+        [250, 250, 250],
+        [220, 20, 60],
+        [255, 230, 0],
+        [0, 100, 240]
+    ])
+
+    # Cell i stacks the 5 base-4 digits of i (most significant first);
+    # the mix is order-independent, so digits are taken LSB-first here.
+    idx = np.arange(1024)
+    digits = (idx[:, None] // (4 ** np.arange(5))) % 4
+    # Integer sums of 0..255 channels: // 5 equals truncating sum / 5.0
+    mixed = colors[digits].sum(axis=1) // 5
+    ref_img = mixed.astype(np.uint8).reshape(DATA_GRID_SIZE, DATA_GRID_SIZE, 3)
 
     return cv2.resize(ref_img, (512, 512), interpolation=cv2.INTER_NEAREST)
 
@@ -55,66 +83,50 @@ def rotate_image(img, direction):
     return img
 
 
-def draw_corner_points(img, points, color_mode: str, page_choice: str | None = None):
-    """Draw corner points with mode-specific colors and labels."""
-    if img is None:
-        return None
-
-    vis = img.copy()
-    color_conf = ColorSystem.get(color_mode)
-    labels = color_conf['corner_labels']
-
+# Corner marker colors (BGR) per calibration board, TL/TR/BR/BL order
+_WHITE_CMY_CORNERS = ((255, 255, 255), (214, 134, 0), (140, 0, 236), (42, 238, 244))
+_WHITE_RBY_CORNERS = ((255, 255, 255), (60, 20, 220), (240, 100, 0), (0, 230, 255))
+_CORNER_COLORS = {
+    "bw": ((255, 255, 255), (0, 0, 0), (0, 0, 0), (0, 0, 0)),
+    "8c": ((255, 255, 255), (255, 255, 0), (0, 0, 0), (0, 255, 255)),
+    "6c": _WHITE_CMY_CORNERS,
+    "5e_page2": ((240, 100, 0), (60, 20, 220), (0, 0, 0), (0, 230, 255)),
+    "5e": _WHITE_RBY_CORNERS,
+    "cmyw": _WHITE_CMY_CORNERS,
+    "rybw": _WHITE_RBY_CORNERS,
+}
+_PAGE2_CORNER_LABELS = ("蓝色 (左上)", "红色 (右上)", "黑色 (右下)", "黄色 (左下)")
+
+
+@lru_cache(maxsize=32)
+def _corner_style(color_mode: str, page2: bool):
+    """Resolve (draw_colors, labels) for a mode once instead of on every redraw."""
+    labels = tuple(ColorSystem.get(color_mode)['corner_labels'])
     if color_mode == "BW (Black & White)" or color_mode == "BW":
-        draw_colors = [
-            (255, 255, 255),  # White (TL)
-            (0, 0, 0),        # Black (TR)
-            (0, 0, 0),        # Black (BR)
-            (0, 0, 0)         # Black (BL)
-        ]
+        key = "bw"
     elif "8-Color" in color_mode:
-        draw_colors = [
-            (255, 255, 255),  # White (TL)
-            (255, 255, 0),    # Cyan/Magenta (TR)
-            (0, 0, 0),        # Black (BR)
-            (0, 255, 255)     # Yellow (BL)
-        ]
+        key = "8c"
     elif "6-Color" in color_mode:
-        draw_colors = [
-            (255, 255, 255),  # White
-            (214, 134, 0),    # Cyan (BGR)
-            (140, 0, 236),    # Magenta (BGR)
-            (42, 238, 244)    # Yellow (BGR)
-        ]
+        key = "6c"
     elif "5-Color Extended" in color_mode:
-        if page_choice is not None and "2" in str(page_choice):
-            labels = ["蓝色 (左上)", "红色 (右上)", "黑色 (右下)", "黄色 (左下)"]
-            draw_colors = [
-                (240, 100, 0),    # Blue (BGR)
-                (60, 20, 220),    # Red (BGR)
-                (0, 0, 0),        # Black (BGR)
-                (0, 230, 255)     # Yellow (BGR)
-            ]
-        else:
-            draw_colors = [
-                (255, 255, 255),  # White
-                (60, 20, 220),    # Red (BGR)
-                (240, 100, 0),    # Blue (BGR)
-                (0, 230, 255)     # Yellow (BGR)
-            ]
+        if page2:
+            return _CORNER_COLORS["5e_page2"], _PAGE2_CORNER_LABELS
+        key = "5e"
     elif "CMYW" in color_mode:
-        draw_colors = [
-            (255, 255, 255),  # White
-            (214, 134, 0),    # Cyan (BGR)
-            (140, 0, 236),    # Magenta (BGR)
-            (42, 238, 244)    # Yellow (BGR)
-        ]
+        key = "cmyw"
     else:  # RYBW
-        draw_colors = [
-            (255, 255, 255),  # White
-            (60, 20, 220),    # Red (BGR)
-            (240, 100, 0),    # Blue (BGR)
-            (0, 230, 255)     # Yellow (BGR)
-        ]
+        key = "rybw"
+    return _CORNER_COLORS[key], labels
+
+
+def draw_corner_points(img, points, color_mode: str, page_choice: str | None = None):
+    """Draw corner points with mode-specific colors and labels."""
+    if img is None:
+        return None
+
+    vis = img.copy()
+    page2 = page_choice is not None and "2" in str(page_choice)
+    draw_colors, labels = _corner_style(color_mode, page2)
 
     for i, pt in enumerate(points):
         color = draw_colors[i] if i < 4 else (0, 255, 0)
@@ -130,34 +142,109 @@ def draw_corner_points(img, points, color_mode: str, page_choice: str | None = N
     return vis
 
 
+def _corner_means(img, m=50):
+    """Mean of the four m x m corner patches (TL, TR, BL, BR) in one reduction."""
+    h, w = img.shape[:2]
+    corners = np.stack([img[0:m, 0:m], img[0:m, w-m:w], img[h-m:h, 0:m], img[h-m:h, w-m:w]])
+    return corners.mean(axis=(1, 2))
+
+
 def apply_auto_white_balance(img):
     """Apply automatic white balance correction."""
-    h, w, _ = img.shape
-    m = 50
-    corners = [img[0:m, 0:m], img[0:m, w-m:w], img[h-m:h, 0:m], img[h-m:h, w-m:w]]
-    avg_white = sum(c.mean(axis=(0, 1)) for c in corners) / 4.0
+    avg_white = _corner_means(img).sum(axis=0) / 4.0
     gain = np.array([255, 255, 255]) / (avg_white + 1e-5)
-    return np.clip(img.astype(float) * gain, 0, 255).astype(np.uint8)
+    # Per-channel gain on uint8 input is a 256-entry table per channel
+    table = np.clip(np.arange(256)[:, None] * gain, 0, 255).astype(np.uint8)
+    return cv2.LUT(img, table.reshape(256, 1, 3))
 
 
 def apply_brightness_correction(img):
     """Apply vignette/brightness correction."""
     h, w, _ = img.shape
     img_lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
-    l, a, b = cv2.split(img_lab)
+    l = img_lab[..., 0]  # view; corrected in place, a/b untouched
 
-    m = 50
-    tl, tr = l[0:m, 0:m].mean(), l[0:m, w-m:w].mean()
-    bl, br = l[h-m:h, 0:m].mean(), l[h-m:h, w-m:w].mean()
+    tl, tr, bl, br = _corner_means(l)
 
     top = np.linspace(tl, tr, w)
     bot = np.linspace(bl, br, w)
-    mask = np.array([top * (1 - y/h) + bot * (y/h) for y in range(h)])
+    ys = (np.arange(h) / h)[:, None]
+    mask = top * (1 - ys) + bot * ys
 
     target = (tl + tr + bl + br) / 4.0
-    l_new = np.clip(l.astype(float) * (target / (mask + 1e-5)), 0, 255).astype(np.uint8)
+    l_new = l * (target / (mask + 1e-5))
+    np.clip(l_new, 0, 255, out=l_new)
+    img_lab[..., 0] = l_new  # float -> uint8 truncates like astype
+
+    return cv2.cvtColor(img_lab, cv2.COLOR_LAB2RGB)
+
 
-    return cv2.cvtColor(cv2.merge([l_new, a, b]), cv2.COLOR_LAB2RGB)
+def _sample_grid(warped, grid_size, physical_grid, cells_to_extract,
+                 offset_x, offset_y, zoom, barrel):
+    """
+    Sample the mean color of every data cell in one vectorized pass.
+
+    Cell centers are computed for the whole grid at once (same lens model as
+    the original per-cell loop), and the 8x8 patch means come from a single
+    ``cv2.integral`` table instead of one ``reg.mean`` per cell.
+
+    Returns:
+        tuple: (extracted (grid, grid, 3) uint8, (N, 2) float64 array of the
+        in-bounds (cx, cy) centers in row-major order)
+    """
+    size = warped.shape[0]
+    # 数据格外有 1 格边框，所以物理坐标 +1
+    phys = np.arange(1, grid_size + 1, dtype=np.float64)
+    n = (phys + 0.5) / physical_grid * 2 - 1
+    nx, ny = np.meshgrid(n, n)
+
+    rad = np.sqrt(nx**2 + ny**2)
+    k = 1 + barrel * (rad**2)
+    dx, dy = nx * k * zoom, ny * k * zoom
+    cx = ((dx + 1) / 2 * size + offset_x).ravel()
+    cy = ((dy + 1) / 2 * size + offset_y).ravel()
+
+    # BW模式：只提取前 cells_to_extract 个
+    valid = (0 <= cx) & (cx < size) & (0 <= cy) & (cy < size)
+    valid[cells_to_extract:] = False
+
+    x0 = np.maximum(cx - 4, 0).astype(np.intp)
+    y0 = np.maximum(cy - 4, 0).astype(np.intp)
+    x1 = np.minimum(cx + 4, size).astype(np.intp)
+    y1 = np.minimum(cy + 4, size).astype(np.intp)
+    x0, y0, x1, y1 = (v[valid] for v in (x0, y0, x1, y1))
+
+    # int32 sums are exact while the whole frame fits (DST_SIZE**2 * 255 < 2**31)
+    sdepth = cv2.CV_32S if warped.size // warped.shape[2] * 255 < 2**31 else cv2.CV_64F
+    integ = cv2.integral(warped, sdepth=sdepth)
+    sums = integ[y1, x1] - integ[y0, x1] - integ[y1, x0] + integ[y0, x0]
+    area = ((y1 - y0) * (x1 - x0))[:, None]
+
+    extracted = np.zeros((grid_size * grid_size, 3), dtype=np.uint8)
+    extracted[valid] = sums // area
+    return (extracted.reshape(grid_size, grid_size, 3),
+            np.column_stack((cx[valid], cy[valid])))
+
+
+def _draw_cross_markers(vis, centers, color, half=4):
+    """
+    Draw 1px cross markers at every center in one indexed write.
+
+    Pixel-identical to ``cv2.drawMarker(..., cv2.MARKER_CROSS, 2 * half, 1)``
+    per center, without one Python->C call per marker.
+    """
+    if len(centers) == 0:
+        return vis
+    h, w = vis.shape[:2]
+    pts = centers.astype(np.intp)
+    arm = np.arange(-half, half + 1)
+    ys = np.concatenate([np.broadcast_to(pts[:, 1:2], (len(pts), arm.size)),
+                         pts[:, 1:2] + arm]).ravel()
+    xs = np.concatenate([pts[:, 0:1] + arm,
+                         np.broadcast_to(pts[:, 0:1], (len(pts), arm.size))]).ravel()
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    vis[ys[inside], xs[inside]] = color
+    return vis
 
 
 def run_extraction(img, points, offset_x, offset_y, zoom, barrel, wb, bright, color_mode="CMYW", page_choice="Page 1"):
@@ -232,7 +319,6 @@ def run_extraction(img, points, offset_x, offset_y, zoom, barrel, wb, bright, co
         warped = apply_brightness_correction(warped)
 
     # Sampling
-    extracted = np.zeros((grid_size, grid_size, 3), dtype=np.uint8)
     vis = warped.copy()
 
     # BW模式特殊处理：只提取前32个色块
@@ -241,45 +327,13 @@ def run_extraction(img, points, offset_x, offset_y, zoom, barrel, wb, bright, co
     else:
         cells_to_extract = grid_size * grid_size
 
-    extracted_count = 0
-    for r in range(grid_size):
-        for c in range(grid_size):
-            # BW模式：只提取前32个
-            if extracted_count >= cells_to_extract:
-                break
-            
-            # 【关键】计算物理位置时的偏移
-            # 无论是 4色 还是 6色，因为都有 1 格边框，所以都需要 +1
-            phys_r = r + 1
-            phys_c = c + 1
-            
-            # 归一化坐标 [-1, 1] (基于 physical_grid)
-            nx = (phys_c + 0.5) / physical_grid * 2 - 1
-            ny = (phys_r + 0.5) / physical_grid * 2 - 1
-
-            rad = np.sqrt(nx**2 + ny**2)
-            k = 1 + barrel * (rad**2)
-            dx, dy = nx * k * zoom, ny * k * zoom
-
-            cx = (dx + 1) / 2 * DST_SIZE + offset_x
-            cy = (dy + 1) / 2 * DST_SIZE + offset_y
-
-            if 0 <= cx < DST_SIZE and 0 <= cy < DST_SIZE:
-                x0, y0 = int(max(0, cx - 4)), int(max(0, cy - 4))
-                x1, y1 = int(min(DST_SIZE, cx + 4)), int(min(DST_SIZE, cy + 4))
-                reg = warped[y0:y1, x0:x1]
-                avg = reg.mean(axis=(0, 1)).astype(int) if reg.size > 0 else [0, 0, 0]
-                cv2.drawMarker(vis, (int(cx), int(cy)), (0, 255, 0), cv2.MARKER_CROSS, 8, 1)
-            else:
-                avg = [0, 0, 0]
-            extracted[r, c] = avg
-            extracted_count += 1
-        
-        # BW模式：提取够32个就退出外层循环
-        if extracted_count >= cells_to_extract:
-            break
+    extracted, centers = _sample_grid(
+        warped, grid_size, physical_grid, cells_to_extract,
+        offset_x, offset_y, zoom, barrel
+    )
+    _draw_cross_markers(vis, centers, (0, 255, 0))
 
-    np.save(LUT_FILE_PATH, extracted)
+    _store_lut(LUT_FILE_PATH, extracted)
     prev = cv2.resize(extracted, (512, 512), interpolation=cv2.INTER_NEAREST)
 
     Stats.increment("extractions")
@@ -298,7 +352,7 @@ def probe_lut_cell(lut_path, evt: gr.SelectData):
     if not actual_path or not os.path.exists(actual_path):
         return "[WARNING] 无数据", None, None
     try:
-        lut = np.load(actual_path)
+        lut = _load_lut(actual_path)
     except Exception:
         return "[WARNING] 数据损坏", None, None
 
@@ -338,7 +392,7 @@ def manual_fix_cell(coord, color_input, lut_path=None):
 
     try:
         print(f"[MANUAL_FIX] Loading LUT from: {actual_path}")
-        lut = np.load(actual_path)
+        lut = _load_lut(actual_path).copy()
         print(f"[MANUAL_FIX] LUT shape: {lut.shape}")
         r, c = coord
         print(f"[MANUAL_FIX] Fixing cell ({r}, {c})")
@@ -360,7 +414,7 @@ def manual_fix_cell(coord, color_input, lut_path=None):
         lut[r, c] = new_color
         
         # Save to the actual path
-        np.save(actual_path, lut)
+        _store_lut(actual_path, lut)
         print(f"[MANUAL_FIX] Saved to: {actual_path}")
         
         # For 8-color mode: also ensure we save to the correct assets path
@@ -383,7 +437,7 @@ def manual_fix_cell(coord, color_input, lut_path=None):
                 
                 if os.path.abspath(actual_path) != os.path.abspath(assets_path):
                     # If the actual_path is not the assets path, save to assets too
-                    np.save(assets_path, lut)
+                    _store_lut(assets_path, lut)
                     print(f"[MANUAL_FIX] Also saved to assets: {assets_path}")
         
         preview = cv2.resize(lut, (512, 512), interpolation=cv2.INTER_NEAREST)
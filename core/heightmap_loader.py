@@ -5,6 +5,7 @@ Lumina Studio - 高度图加载与处理模块 (Heightmap Loader)
 灰度映射约定：纯黑(0) = 最大高度，纯白(255) = 最小高度（底板厚度）。
 """
 
+import os
 import numpy as np
 import cv2
 from PIL import Image as PILImage
@@ -41,9 +42,8 @@ class HeightmapLoader:
         channels = image.shape[2]
 
         if channels == 4:
-            # RGBA → BGR → 灰度
-            bgr = cv2.cvtColor(image, cv2.COLOR_RGBA2BGR)
-            gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+            # RGBA → 灰度（单步转换，与 RGBA → BGR → 灰度 逐位一致）
+            gray = cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY)
         elif channels == 3:
             # cv2.imread 读取的是 BGR 格式，直接转灰度
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -92,6 +92,11 @@ class HeightmapLoader:
         Returns:
             np.ndarray: (H, W) float32，单位 mm
         """
+        if grayscale.dtype == np.uint8:
+            # uint8 只有 256 个取值：先算 256 项查找表，再一次索引完成映射
+            levels = np.arange(256, dtype=np.float32)
+            table = max_relief_height - (levels / 255.0) * (max_relief_height - base_thickness)
+            return table.astype(np.float32)[grayscale]
         height_mm = max_relief_height - (grayscale.astype(np.float32) / 255.0) * (max_relief_height - base_thickness)
         return height_mm.astype(np.float32)
 
@@ -127,7 +132,8 @@ class HeightmapLoader:
 
         标准差小于 1.0 表示灰度变化极小，浮雕效果可能不明显。
         """
-        std_val = float(np.std(grayscale))
+        _, stddev = cv2.meanStdDev(grayscale)  # 单次遍历求标准差
+        std_val = float(stddev[0, 0])
         if std_val < 1.0:
             return f"[WARNING] 高度图灰度变化极小（标准差 {std_val:.2f}），浮雕效果可能不明显"
         return None
@@ -154,8 +160,12 @@ class HeightmapLoader:
 
         # 读取图像文件（兼容中文路径）
         try:
-            img_data = np.fromfile(heightmap_path, dtype=np.uint8)
-            image = cv2.imdecode(img_data, cv2.IMREAD_UNCHANGED)
+            if heightmap_path.isascii() and os.path.isfile(heightmap_path):
+                # ASCII 路径：cv2 直接读文件，省去一次 Python 侧字节拷贝
+                image = cv2.imread(heightmap_path, cv2.IMREAD_UNCHANGED)
+            else:
+                img_data = np.fromfile(heightmap_path, dtype=np.uint8)
+                image = cv2.imdecode(img_data, cv2.IMREAD_UNCHANGED)
         except Exception as e:
             return {
                 'success': False,
@@ -282,10 +292,12 @@ class HeightmapLoader:
         )
 
         # Step 7: 计算统计信息
+        # minMaxLoc + mean：两次遍历代替 min/max/mean 三次
+        min_mm, max_mm, _, _ = cv2.minMaxLoc(height_matrix)
         stats = {
-            'min_mm': float(np.min(height_matrix)),
-            'max_mm': float(np.max(height_matrix)),
-            'avg_mm': float(np.mean(height_matrix))
+            'min_mm': float(min_mm),
+            'max_mm': float(max_mm),
+            'avg_mm': float(cv2.mean(height_matrix)[0])
         }
 
         print(f"[HEIGHTMAP] 高度映射完成: "
@@ -3,6 +3,9 @@ Lumina Studio - Internationalization Module
 Internationalization module - Complete Chinese-English translation dictionary
 """
 
+from types import MappingProxyType
+from typing import Mapping
+
 
 class I18n:
     """
@@ -1342,6 +1345,29 @@ Special thanks to:
         },
     }
     
+    # Flattened {lang: {key: text}} views of TEXTS, rebuilt by _rebuild()
+    _LANGS = {}
+
+    @staticmethod
+    def _rebuild():
+        """Flatten TEXTS into one direct key -> text dict per language."""
+        langs = {'zh'}.union(*I18n.TEXTS.values())
+        I18n._LANGS = {
+            lang: {key: entry.get(lang, entry.get('zh', key)) for key, entry in I18n.TEXTS.items()}
+            for lang in langs
+        }
+
+    @staticmethod
+    def update(texts: dict):
+        """
+        Add or override translation entries at runtime
+        
+        Args:
+            texts: {key: {'zh': ..., 'en': ...}}, same layout as TEXTS
+        """
+        I18n.TEXTS.update(texts)
+        I18n._rebuild()
+
     @staticmethod
     def get(key: str, lang: str = 'zh') -> str:
         """
@@ -1354,12 +1380,10 @@ Special thanks to:
         Returns:
             str: Translated text, returns key itself if key doesn't exist
         """
-        if key in I18n.TEXTS:
-            return I18n.TEXTS[key].get(lang, I18n.TEXTS[key].get('zh', key))
-        return key
+        return I18n._LANGS.get(lang, I18n._LANGS['zh']).get(key, key)
     
     @staticmethod
-    def get_all(lang: str = 'zh') -> dict:
+    def get_all(lang: str = 'zh') -> Mapping[str, str]:
         """
         Get all texts in specified language version
         
@@ -1367,6 +1391,9 @@ Special thanks to:
             lang: Language code ('zh' or 'en')
         
         Returns:
-            dict: {key: translated_text}
+            Mapping: read-only {key: translated_text} view of the language table
         """
-        return {key: I18n.get(key, lang) for key in I18n.TEXTS.keys()}
+        return MappingProxyType(I18n._LANGS.get(lang, I18n._LANGS['zh']))
+
+
+I18n._rebuild()
@@ -51,12 +51,11 @@ class LuminaImageProcessor:
             numpy array, 同 shape, dtype float64, Lab 值
         """
         original_shape = rgb_array.shape
+        # uint8 输入不复制；RGB2Lab 一步完成，与 RGB→BGR→Lab 逐位一致
+        rgb_3d = rgb_array.astype(np.uint8, copy=False)
         if rgb_array.ndim == 2:
-            rgb_3d = rgb_array.reshape(1, -1, 3).astype(np.uint8)
-        else:
-            rgb_3d = rgb_array.astype(np.uint8)
-        bgr = cv2.cvtColor(rgb_3d, cv2.COLOR_RGB2BGR)
-        lab = cv2.cvtColor(bgr, cv2.COLOR_BGR2Lab).astype(np.float64)
+            rgb_3d = rgb_3d.reshape(1, -1, 3)
+        lab = cv2.cvtColor(rgb_3d, cv2.COLOR_RGB2Lab).astype(np.float64)
         if len(original_shape) == 2:
             return lab.reshape(original_shape)
         return lab
@@ -484,9 +483,7 @@ class LuminaImageProcessor:
         
         if is_svg:
             print("[IMAGE_PROCESSOR] SVG detected - Engaging Ultra-High-Fidelity Vector Mode")
-            img_arr = self._load_svg(image_path, target_width_mm, pixels_per_mm=10.0)
-            # SVG reset to PIL object to reuse subsequent logic (e.g., get dimensions)
-            img = Image.fromarray(img_arr)
+            img_arr = np.ascontiguousarray(self._load_svg(image_path, target_width_mm, pixels_per_mm=10.0))
             
             # [CRITICAL] SVG is also a type of High-Fidelity, but it doesn't need denoising
             # Force override filter parameters, because vector graphics have no noise, no need to blur
@@ -501,28 +498,27 @@ class LuminaImageProcessor:
             print("[IMAGE_PROCESSOR] Super-sampling at 20 px/mm eliminates jagged edges naturally")
             
             # Recalculate target_w/h (based on rendered dimensions)
-            target_w, target_h = img.size
+            # The render is already at target size, so it skips the resize below
+            target_h, target_w = img_arr.shape[:2]
             pixel_to_mm_scale = 0.05  # 20 px/mm (1/20) - Ultra-High-Fidelity
         else:
             # [Original Logic] Bitmap loading
-            # Load image
-            img = Image.open(image_path).convert('RGBA')
+            # Load image (opened and decoded once)
+            original_img = Image.open(image_path)
+            img = original_img.convert('RGBA')
             
             # DEBUG: Check original image properties
             print(f"[IMAGE_PROCESSOR] Original image: {image_path}")
-            print(f"[IMAGE_PROCESSOR] Image mode: {Image.open(image_path).mode}")
-            print(f"[IMAGE_PROCESSOR] Image size: {Image.open(image_path).size}")
+            print(f"[IMAGE_PROCESSOR] Image mode: {original_img.mode}")
+            print(f"[IMAGE_PROCESSOR] Image size: {original_img.size}")
             
             # Check if image has transparency
-            original_img = Image.open(image_path)
             has_alpha = original_img.mode in ('RGBA', 'LA') or (original_img.mode == 'P' and 'transparency' in original_img.info)
             print(f"[IMAGE_PROCESSOR] Has alpha channel: {has_alpha}")
             
             if has_alpha:
-                # Check alpha channel statistics
-                if original_img.mode != 'RGBA':
-                    original_img = original_img.convert('RGBA')
-                alpha_data = np.array(original_img)[:, :, 3]
+                # Check alpha channel statistics (reuse the RGBA conversion)
+                alpha_data = np.asarray(img)[:, :, 3]
                 print(f"[IMAGE_PROCESSOR] Alpha stats: min={alpha_data.min()}, max={alpha_data.max()}, mean={alpha_data.mean():.1f}")
                 print(f"[IMAGE_PROCESSOR] Transparent pixels (alpha<10): {np.sum(alpha_data < 10)}")
             
@@ -551,10 +547,11 @@ class LuminaImageProcessor:
         # 
         # SOLUTION: Use NEAREST to preserve hard edges and ensure dark pixels
         # map to solid dark stacks from Layer 1 upwards.
-        print(f"[IMAGE_PROCESSOR] Using NEAREST interpolation (no anti-aliasing)")
-        img = img.resize((target_w, target_h), Image.Resampling.NEAREST)
+        if not is_svg:
+            print(f"[IMAGE_PROCESSOR] Using NEAREST interpolation (no anti-aliasing)")
+            img = img.resize((target_w, target_h), Image.Resampling.NEAREST)
+            img_arr = np.array(img)
         
-        img_arr = np.array(img)
         rgb_arr = img_arr[:, :, :3]
         alpha_arr = img_arr[:, :, 3]
         
@@ -713,7 +710,8 @@ class LuminaImageProcessor:
             # 使用 KDTree 加速
             from scipy.spatial import KDTree
             centers_tree = KDTree(centers)
-            _, labels = centers_tree.query(pixels_full)
+            # 每个像素独立查询，workers=-1 多线程并行，结果不变
+            _, labels = centers_tree.query(pixels_full, workers=-1)
             print(f"[IMAGE_PROCESSOR] ⏱️ KDTree query: {time.time() - t_map:.2f}s")
             
             centers = centers.astype(np.uint8)
@@ -818,8 +816,16 @@ class LuminaImageProcessor:
         print(f"[IMAGE_PROCESSOR] Direct pixel-level matching (Pixel Art mode, CIELAB space)...")
         
         flat_rgb = rgb_arr.reshape(-1, 3)
-        flat_lab = self._rgb_to_lab(flat_rgb)
-        _, indices = self.kdtree.query(flat_lab)
+        # 像素画颜色数远少于像素数：只对唯一颜色做 Lab 转换和 KDTree 查询，
+        # 再按 inverse 散回全部像素（结果与逐像素查询一致）
+        codes = (flat_rgb[:, 0].astype(np.uint32)
+                 | (flat_rgb[:, 1].astype(np.uint32) << 8)
+                 | (flat_rgb[:, 2].astype(np.uint32) << 16))
+        _, first_idx, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        unique_lab = self._rgb_to_lab(flat_rgb[first_idx])
+        # workers=-1 按核数并行，结果与单线程一致
+        _, unique_indices = self.kdtree.query(unique_lab, workers=-1)
+        indices = unique_indices[inverse.reshape(-1)]
         
         matched_rgb = self.lut_rgb[indices].reshape(target_h, target_w, 3)
         material_matrix = self.ref_stacks[indices].reshape(
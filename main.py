@@ -211,6 +211,9 @@ if __name__ == "__main__":
             print(f"[TRAY] {TRAY_POLICY_REASON}")
 
         threading.Thread(target=start_browser, args=(PORT,), daemon=True).start()
+        # Compile numba preview kernels while the UI is being built
+        from core.converter import warmup_preview_kernels
+        threading.Thread(target=warmup_preview_kernels, daemon=True).start()
         print(f"✨ Lumina Studio is running on http://127.0.0.1:{PORT}")
         app = create_app()
 
@@ -0,0 +1,408 @@
+"""
+Lumina Studio - 转换器向量化/Numba 内核属性测试 (Property-Based Tests)
+
+使用 Hypothesis 验证 core/converter.py 中的向量化实现与原逐像素 /
+逐条目实现结果一致。
+"""
+
+import colorsys
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+from hypothesis import given, settings
+from hypothesis import strategies as st
+from hypothesis.extra.numpy import arrays
+
+# Ensure project root is on sys.path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config import PrinterConfig
+from core.converter import (
+    _build_preview_rgba,
+    _build_preview_voxel_arrays,
+    _build_preview_voxel_arrays_numpy,
+    _build_cloisonne_voxel_matrix,
+    _build_relief_voxel_matrix,
+    _build_voxel_matrix,
+    _build_voxel_matrix_faceup,
+    _classify_hues,
+    _render_highlight,
+)
+
+
+# ---------------------------------------------------------------------------
+# Reference implementations (the original per-item loops)
+# ---------------------------------------------------------------------------
+
+def _classify_hue_reference(r: int, g: int, b: int) -> str:
+    """Original per-color hue classification via colorsys."""
+    h, s, v = colorsys.rgb_to_hsv(r / 255.0, g / 255.0, b / 255.0)
+    h360 = h * 360
+    if s < 0.15 or v < 0.10:
+        return 'neutral'
+    if h360 < 15 or h360 >= 345:
+        return 'red'
+    elif h360 < 40:
+        return 'orange'
+    elif h360 < 70:
+        return 'yellow'
+    elif h360 < 160:
+        return 'green'
+    elif h360 < 195:
+        return 'cyan'
+    elif h360 < 260:
+        return 'blue'
+    elif h360 < 345:
+        return 'purple'
+    return 'neutral'
+
+
+_CUBE_FACES = [
+    [0, 2, 1], [0, 3, 2],
+    [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4],
+    [1, 2, 6], [1, 6, 5],
+    [2, 3, 7], [2, 7, 6],
+    [3, 0, 4], [3, 4, 7],
+]
+
+
+def _preview_boxes_reference(mask_solid, matched_rgb, backing_rgba, backing_z_range,
+                             total_layers, shrink):
+    """Original list-append builder of _create_preview_mesh."""
+    height, width = mask_solid.shape
+    vertices, faces, face_colors = [], [], []
+
+    def _box(x0, x1, y0, y1, z0, z1, rgba):
+        base_idx = len(vertices)
+        vertices.extend([
+            [x0, y0, z0], [x1, y0, z0], [x1, y1, z0], [x0, y1, z0],
+            [x0, y0, z1], [x1, y0, z1], [x1, y1, z1], [x0, y1, z1],
+        ])
+        for f in _CUBE_FACES:
+            faces.append([v + base_idx for v in f])
+            face_colors.append(rgba)
+
+    for y in range(height):
+        for x in range(width):
+            if not mask_solid[y, x]:
+                continue
+            rgb = matched_rgb[y, x]
+            rgba = [int(rgb[0]), int(rgb[1]), int(rgb[2]), 255]
+            world_y = height - 1 - y
+            x0, x1 = x + shrink, x + 1 - shrink
+            y0, y1 = world_y + shrink, world_y + 1 - shrink
+            if backing_z_range is not None:
+                backing_start, backing_end = backing_z_range
+                _box(x0, x1, y0, y1, backing_start, backing_end + 1, list(backing_rgba))
+                if backing_start > 0:
+                    _box(x0, x1, y0, y1, 0, backing_start, rgba)
+                if backing_end + 1 < total_layers:
+                    _box(x0, x1, y0, y1, backing_end + 1, total_layers, rgba)
+            else:
+                _box(x0, x1, y0, y1, 0, total_layers, rgba)
+
+    return (np.array(vertices, dtype=np.float64).reshape(-1, 3),
+            np.array(faces, dtype=np.int64).reshape(-1, 3),
+            np.array(face_colors, dtype=np.uint8).reshape(-1, 4))
+
+
+def _relief_heightmap_reference(material_matrix, mask_solid, height_matrix, backing_color_id):
+    """Original per-pixel optical fill of the heightmap relief path."""
+    optical_layers = 5
+    optical_mm = optical_layers * PrinterConfig.LAYER_HEIGHT
+    heights = height_matrix.copy()
+    heights[mask_solid & (heights < optical_mm)] = optical_mm
+    max_height_mm = np.max(heights[mask_solid])
+    max_z = max(optical_layers + 1, int(np.ceil(max_height_mm / PrinterConfig.LAYER_HEIGHT)))
+    target_h, target_w = mask_solid.shape
+    full = np.full((max_z, target_h, target_w), -1, dtype=int)
+    target_z = np.clip(np.ceil(heights / PrinterConfig.LAYER_HEIGHT).astype(int), optical_layers, max_z)
+    start_z = target_z - optical_layers
+    for y in range(target_h):
+        for x in range(target_w):
+            if not mask_solid[y, x]:
+                continue
+            full[:start_z[y, x], y, x] = backing_color_id
+            for layer_idx in range(optical_layers):
+                z = start_z[y, x] + layer_idx
+                if z < max_z:
+                    full[z, y, x] = material_matrix[y, x, optical_layers - 1 - layer_idx]
+    return full
+
+
+def _relief_color_map_reference(matched_rgb, material_matrix, mask_solid, color_height_map,
+                                default_height, backing_color_id):
+    """Original per-pixel hex lookup + per-voxel fill of the color-map relief path."""
+    optical_layers = 5
+    target_h, target_w = mask_solid.shape
+    heights = np.full((target_h, target_w), default_height, dtype=np.float32)
+    for y in range(target_h):
+        for x in range(target_w):
+            if mask_solid[y, x]:
+                r, g, b = matched_rgb[y, x]
+                hex_color = f'#{r:02x}{g:02x}{b:02x}'
+                if hex_color in color_height_map:
+                    heights[y, x] = color_height_map[hex_color]
+    max_height_mm = np.max(heights[mask_solid])
+    max_z = max(optical_layers + 1, int(np.ceil(max_height_mm / PrinterConfig.LAYER_HEIGHT)))
+    full = np.full((max_z, target_h, target_w), -1, dtype=int)
+    target_z = np.clip(np.ceil(heights / PrinterConfig.LAYER_HEIGHT).astype(np.int32), optical_layers, max_z)
+    for y in range(target_h):
+        for x in range(target_w):
+            if not mask_solid[y, x]:
+                continue
+            start = target_z[y, x] - optical_layers
+            full[:start, y, x] = backing_color_id
+            for layer_idx in range(optical_layers):
+                if start + layer_idx < max_z:
+                    full[start + layer_idx, y, x] = material_matrix[y, x, optical_layers - 1 - layer_idx]
+    return full
+
+
+@st.composite
+def solid_image_strategy(draw: st.DrawFn):
+    """Small (matched_rgb, mask_solid) pair."""
+    h = draw(st.integers(min_value=1, max_value=12))
+    w = draw(st.integers(min_value=1, max_value=12))
+    matched_rgb = draw(arrays(np.uint8, (h, w, 3)))
+    mask_solid = draw(arrays(np.bool_, (h, w)))
+    return matched_rgb, mask_solid
+
+
+# ---------------------------------------------------------------------------
+# _build_preview_rgba
+# ---------------------------------------------------------------------------
+
+@settings(max_examples=100, deadline=None)
+@given(image=solid_image_strategy())
+def test_preview_rgba_matches_masked_writes(image):
+    """Dense fill + mask multiply equals the zeros + two masked writes build."""
+    matched_rgb, mask_solid = image
+    expected = np.zeros(mask_solid.shape + (4,), dtype=np.uint8)
+    expected[mask_solid, :3] = matched_rgb[mask_solid]
+    expected[mask_solid, 3] = 255
+    np.testing.assert_array_equal(_build_preview_rgba(matched_rgb, mask_solid), expected)
+
+
+# ---------------------------------------------------------------------------
+# _build_preview_voxel_arrays
+# ---------------------------------------------------------------------------
+
+@settings(max_examples=100, deadline=None)
+@given(
+    image=solid_image_strategy(),
+    total_layers=st.integers(min_value=2, max_value=30),
+    backing=st.one_of(st.none(), st.tuples(st.integers(0, 10), st.integers(0, 10))),
+)
+def test_preview_voxel_arrays_match_list_builder(image, total_layers, backing):
+    """Kernel and broadcasting builds equal the original list-append builder."""
+    matched_rgb, mask_solid = image
+    if backing is not None:
+        backing = (min(backing), min(max(backing), total_layers - 1))
+    backing_rgba = np.array([10, 20, 30, 255], dtype=np.uint8)
+    backing_start, backing_end = backing if backing is not None else (0, 0)
+
+    vertices, faces, face_colors = _build_preview_voxel_arrays(
+        mask_solid, matched_rgb, backing_rgba, backing_start, backing_end,
+        total_layers, 0.05, backing is not None
+    )
+    ref_vertices, ref_faces, ref_colors = _preview_boxes_reference(
+        mask_solid, matched_rgb, backing_rgba, backing, total_layers, 0.05
+    )
+
+    np.testing.assert_allclose(vertices, ref_vertices)
+    np.testing.assert_array_equal(faces, ref_faces)
+    np.testing.assert_array_equal(face_colors, ref_colors)
+
+    vertices, faces, face_colors = _build_preview_voxel_arrays_numpy(
+        mask_solid, matched_rgb, backing_rgba, backing_start, backing_end,
+        total_layers, 0.05, backing is not None
+    )
+    np.testing.assert_allclose(vertices, ref_vertices)
+    np.testing.assert_array_equal(faces, ref_faces)
+    np.testing.assert_array_equal(face_colors, ref_colors)
+
+
+# ---------------------------------------------------------------------------
+# _build_voxel_matrix
+# ---------------------------------------------------------------------------
+
+@settings(max_examples=100, deadline=None)
+@given(
+    data=st.data(),
+    double=st.booleans(),
+    spacer_thick=st.sampled_from([0.08, 0.4, 1.2]),
+    backing_color_id=st.sampled_from([-2, 0, 3]),
+)
+def test_voxel_matrix_matches_spacer_loop(data, double, spacer_thick, backing_color_id):
+    """Broadcast spacer write equals the original per-layer spacer copy."""
+    h = data.draw(st.integers(min_value=1, max_value=8))
+    w = data.draw(st.integers(min_value=1, max_value=8))
+    material_matrix = data.draw(arrays(np.int32, (h, w, 5), elements=st.integers(-1, 7)))
+    mask_solid = data.draw(arrays(np.bool_, (h, w)))
+    structure_mode = "Double-sided" if double else "Single-sided"
+
+    full_matrix, meta = _build_voxel_matrix(
+        material_matrix, mask_solid, spacer_thick, structure_mode, backing_color_id
+    )
+
+    spacer_layers = max(1, int(round(spacer_thick / PrinterConfig.LAYER_HEIGHT)))
+    spacer = np.full((h, w), -1)
+    spacer[mask_solid] = backing_color_id
+    stack = [material_matrix.transpose(2, 0, 1), np.repeat(spacer[None], spacer_layers, axis=0)]
+    if double:
+        stack.append(material_matrix[..., ::-1].transpose(2, 0, 1))
+    np.testing.assert_array_equal(full_matrix, np.concatenate(stack))
+    assert full_matrix.dtype == np.int8
+    assert meta['backing_z_range'] == (5, 5 + spacer_layers - 1)
+
+
+@settings(max_examples=100, deadline=None)
+@given(data=st.data(), n_layers=st.sampled_from([5, 6]), spacer_thick=st.sampled_from([0.08, 0.8]))
+def test_faceup_and_cloisonne_optical_fill_match_layer_loop(data, n_layers, spacer_thick):
+    """Layer-major fused write equals the per-layer np.where loop."""
+    h = data.draw(st.integers(min_value=1, max_value=8))
+    w = data.draw(st.integers(min_value=1, max_value=8))
+    material_matrix = data.draw(arrays(np.int32, (h, w, n_layers), elements=st.integers(-1, 7)))
+    mask_solid = data.draw(arrays(np.bool_, (h, w)))
+    mask_wire = data.draw(arrays(np.bool_, (h, w)))
+    spacer_layers = max(1, int(round(spacer_thick / PrinterConfig.LAYER_HEIGHT)))
+
+    full_matrix, _ = _build_voxel_matrix_faceup(material_matrix, mask_solid, spacer_thick, 2)
+    for i in range(n_layers):
+        np.testing.assert_array_equal(
+            full_matrix[spacer_layers + i],
+            np.where(mask_solid, material_matrix[:, :, n_layers - 1 - i], -1)
+        )
+
+    full_matrix, _ = _build_cloisonne_voxel_matrix(
+        material_matrix, mask_solid, mask_wire, spacer_thick, 0.4, 2
+    )
+    for i in range(5):
+        np.testing.assert_array_equal(
+            full_matrix[spacer_layers + i],
+            np.where(mask_solid, material_matrix[:, :, 4 - i], -1)
+        )
+    assert (full_matrix[:spacer_layers] == np.where(mask_solid, 2, -1)).all()
+    assert (full_matrix[spacer_layers + 5:] == np.where(mask_wire & mask_solid, -3, -1)).all()
+
+
+# ---------------------------------------------------------------------------
+# _build_relief_voxel_matrix (heightmap mode)
+# ---------------------------------------------------------------------------
+
+@settings(max_examples=100, deadline=None)
+@given(data=st.data())
+def test_relief_heightmap_fill_matches_per_pixel_loop(data):
+    """Single put_along_axis scatter equals the per-pixel optical fill."""
+    h = data.draw(st.integers(min_value=1, max_value=10))
+    w = data.draw(st.integers(min_value=1, max_value=10))
+    n_layers = data.draw(st.sampled_from([5, 6]))
+    material_matrix = data.draw(arrays(np.int32, (h, w, n_layers), elements=st.integers(-1, 7)))
+    mask_solid = data.draw(arrays(np.bool_, (h, w)))
+    mask_solid[0, 0] = True
+    height_matrix = data.draw(arrays(
+        np.float32, (h, w), elements=st.floats(0.0, 5.0, width=32)
+    ))
+    matched_rgb = np.zeros((h, w, 3), dtype=np.uint8)
+
+    full_matrix, meta = _build_relief_voxel_matrix(
+        matched_rgb, material_matrix, mask_solid, {}, 1.0, "Single-sided", 2, 0.42,
+        height_matrix=height_matrix
+    )
+    expected = _relief_heightmap_reference(material_matrix, mask_solid, height_matrix, 2)
+
+    np.testing.assert_array_equal(full_matrix, expected)
+    assert meta['is_relief'] is True
+
+
+@settings(max_examples=100, deadline=None)
+@given(data=st.data())
+def test_relief_color_map_fill_matches_per_pixel_loop(data):
+    """Unique-color height lookup + vectorized fill equal the per-pixel loops."""
+    h = data.draw(st.integers(min_value=1, max_value=10))
+    w = data.draw(st.integers(min_value=1, max_value=10))
+    # few distinct colors so the height map hits and misses
+    matched_rgb = data.draw(arrays(np.uint8, (h, w, 3), elements=st.sampled_from([0, 17, 255])))
+    material_matrix = data.draw(arrays(np.int32, (h, w, 5), elements=st.integers(-1, 7)))
+    mask_solid = data.draw(arrays(np.bool_, (h, w)))
+    mask_solid[0, 0] = True
+    palette = [f'#{r:02x}{g:02x}{b:02x}' for r in (0, 17, 255) for g in (0, 17, 255) for b in (0, 17, 255)]
+    keys = data.draw(st.lists(st.sampled_from(palette), unique=True, max_size=10))
+    color_height_map = {k: data.draw(st.sampled_from([0.2, 0.8, 1.5, 3.1])) for k in keys}
+
+    full_matrix, meta = _build_relief_voxel_matrix(
+        matched_rgb, material_matrix, mask_solid, color_height_map, 1.2, "Single-sided", 3, 0.42
+    )
+    expected = _relief_color_map_reference(
+        matched_rgb, material_matrix, mask_solid, color_height_map, 1.2, 3
+    )
+
+    np.testing.assert_array_equal(full_matrix, expected)
+    assert meta['is_relief'] is True
+
+
+# ---------------------------------------------------------------------------
+# _render_highlight
+# ---------------------------------------------------------------------------
+
+def test_integer_dim_matches_float_dim():
+    """(2 * g + 400) // 5 equals the original (g * 0.4 + 80) -> uint8 for all g."""
+    gray = np.arange(256)
+    expected = (gray.astype(np.uint8) * 0.4 + 80).astype(np.uint8)
+    np.testing.assert_array_equal((2 * gray + 400) // 5, expected)
+
+
+@settings(max_examples=100, deadline=None)
+@given(image=solid_image_strategy(), data=st.data())
+def test_render_highlight_matches_masked_writes(image, data):
+    """Fused highlight fill (numba and NumPy paths) equals the original masked writes."""
+    matched_rgb, mask_solid = image
+    highlight_mask = data.draw(arrays(np.bool_, mask_solid.shape)) & mask_solid
+
+    expected = np.zeros(mask_solid.shape + (4,), dtype=np.uint8)
+    dim_mask = mask_solid & ~highlight_mask
+    gray = np.mean(matched_rgb[dim_mask], axis=1).astype(np.uint8)
+    dimmed = (gray * 0.4 + 80).astype(np.uint8)
+    expected[dim_mask, 0] = dimmed
+    expected[dim_mask, 1] = dimmed
+    expected[dim_mask, 2] = dimmed
+    expected[dim_mask, 3] = 180
+    expected[highlight_mask, :3] = matched_rgb[highlight_mask]
+    expected[highlight_mask, 3] = 255
+
+    out = np.full(expected.shape, 77, dtype=np.uint8)
+    _render_highlight(matched_rgb, mask_solid, highlight_mask, out)
+    np.testing.assert_array_equal(out, expected)
+
+    with patch('core.converter._render_highlight_numba', None):
+        out = np.full(expected.shape, 77, dtype=np.uint8)
+        _render_highlight(matched_rgb, mask_solid, highlight_mask, out)
+    np.testing.assert_array_equal(out, expected)
+
+
+# ---------------------------------------------------------------------------
+# _classify_hues
+# ---------------------------------------------------------------------------
+
+@settings(max_examples=200)
+@given(rgb=arrays(np.uint8, st.tuples(st.integers(1, 64), st.just(3))))
+def test_classify_hues_matches_colorsys(rgb):
+    """Vectorized hue classes (gufunc and np.select) equal colorsys + thresholds."""
+    expected = [_classify_hue_reference(*map(int, c)) for c in rgb]
+    assert _classify_hues(rgb) == expected
+    with patch('core.converter._classify_hue_idx_numba', None):
+        assert _classify_hues(rgb) == expected
+
+
+def test_classify_hues_full_grid():
+    """Exhaustive check on a coarse RGB grid including grays and extremes."""
+    axis = np.arange(0, 256, 5)
+    rgb = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    expected = [_classify_hue_reference(*map(int, c)) for c in rgb]
+    assert _classify_hues(rgb) == expected
+    with patch('core.converter._classify_hue_idx_numba', None):
+        assert _classify_hues(rgb) == expected
@@ -0,0 +1,559 @@
+"""Unit tests for converter preview caches and fast paths."""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from core.converter import (
+    _click_calibration,
+    _get_matched_packed,
+    _hex_to_packed_key,
+    _pack_rgb,
+    _render_loop_layer,
+)
+
+
+def test_pack_rgb_layout():
+    rgb = np.array([[[1, 2, 3], [255, 0, 128]]], dtype=np.uint8)
+    packed = _pack_rgb(rgb)
+    assert packed.dtype == np.uint32
+    assert packed.tolist() == [[1 | (2 << 8) | (3 << 16), 255 | (128 << 16)]]
+
+
+def test_hex_to_packed_key_matches_pack_rgb():
+    assert _hex_to_packed_key("#0a80ff") == int(_pack_rgb(np.array([[10, 128, 255]]))[0])
+    try:
+        _hex_to_packed_key("#zz0000")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("malformed hex must raise ValueError")
+
+
+def test_matched_packed_built_lazily():
+    """No packed image is stored until the first highlight lookup."""
+    rgb = np.zeros((2, 3, 3), dtype=np.uint8)
+    cache = {"matched_rgb": rgb}
+    packed = _get_matched_packed(cache)
+    assert "matched_packed" in cache
+    assert _get_matched_packed(cache) is packed
+
+
+def test_matched_packed_rebuilt_when_matched_rgb_replaced():
+    """Replacing cache['matched_rgb'] (UI merge / reset) must not reuse stale keys."""
+    cache = {"matched_rgb": np.zeros((2, 2, 3), dtype=np.uint8)}
+    stale = _get_matched_packed(cache)
+
+    cache["matched_rgb"] = np.full((2, 2, 3), 7, dtype=np.uint8)
+    fresh = _get_matched_packed(cache)
+
+    assert fresh is not stale
+    assert (fresh == (7 | (7 << 8) | (7 << 16))).all()
+
+
+def test_matched_packed_survives_shallow_copy_with_new_rgb():
+    """A shallow copy carrying the old entry but a new matched_rgb rebuilds."""
+    cache = {"matched_rgb": np.zeros((1, 1, 3), dtype=np.uint8)}
+    _get_matched_packed(cache)
+    updated = cache.copy()
+    updated["matched_rgb"] = np.array([[[9, 0, 0]]], dtype=np.uint8)
+    assert _get_matched_packed(updated).tolist() == [[9]]
+
+
+def test_render_loop_layer_is_memoized():
+    """Same geometry/angle returns the cached image; a new angle renders again."""
+    _render_loop_layer.cache_clear()
+    a = _render_loop_layer(40, 80, 12, 30, 132)
+    b = _render_loop_layer(40, 80, 12, 30, 132)
+    c = _render_loop_layer(40, 80, 12, 35, 132)
+    assert a is b
+    assert c is not a
+    info = _render_loop_layer.cache_info()
+    assert info.hits == 1 and info.misses == 2
+
+
+def test_render_loop_layer_tight_size_does_not_clip():
+    """The tight layer size used by _draw_loop_on_canvas keeps the rotated body inside."""
+    loop_w_px, loop_h_px, hole_r_px = 40, 90, 12
+    rect_h = max(1, loop_h_px - loop_w_px // 2)
+    loop_size = 2 * int(np.ceil(np.hypot(loop_w_px // 2, rect_h))) + 6
+    for angle in (0, 30, 45, 90, 135, 180, -60):
+        alpha = np.array(_render_loop_layer(loop_w_px, loop_h_px, hole_r_px, angle, loop_size))[..., 3]
+        assert alpha.shape == (loop_size, loop_size)
+        border = np.concatenate([alpha[0], alpha[-1], alpha[:, 0], alpha[:, -1]])
+        assert not border.any(), angle
+
+
+def test_render_loop_layer_raster_shape():
+    """Unrotated marker: red body, white outline, transparent hole and background."""
+    layer = np.array(_render_loop_layer(40, 80, 12, 0, 140))
+    lc = 70
+    assert layer.dtype == np.uint8 and layer.shape == (140, 140, 4)
+    # hole centre and far corner are fully transparent
+    assert layer[lc, lc, 3] == 0
+    assert layer[0, 0, 3] == 0
+    # body fill inside the rectangle below the hole
+    assert tuple(layer[lc + 40, lc]) == (220, 60, 60, 200)
+    # outline on the rectangle's left edge and the circle's top
+    assert tuple(layer[lc + 40, lc - 20]) == (255, 255, 255, 255)
+    assert tuple(layer[lc - 20, lc]) == (255, 255, 255, 255)
+
+
+def _replacement_cache():
+    matched = np.zeros((4, 4, 3), dtype=np.uint8)
+    return {
+        "matched_rgb": matched,
+        "mask_solid": np.ones((4, 4), dtype=bool),
+        "color_conf": None,
+    }
+
+
+def test_replacements_reused_for_unchanged_signature():
+    """Loop/bed events with the same replacements reuse the remapped image."""
+    from core.converter import update_preview_with_replacements
+
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[0, 0] = True
+    regions = [{"mask": mask, "replacement": "#ff0000"}]
+    _, first, _ = update_preview_with_replacements(_replacement_cache(), regions)
+    assert first["matched_rgb"][0, 0].tolist() == [255, 0, 0]
+
+    _, second, _ = update_preview_with_replacements(first, regions, add_loop=False)
+    assert second["matched_rgb"] is first["matched_rgb"]
+
+
+def test_replacements_recomputed_when_signature_changes():
+    from core.converter import update_preview_with_replacements
+
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[0, 0] = True
+    _, first, _ = update_preview_with_replacements(
+        _replacement_cache(), [{"mask": mask, "replacement": "#ff0000"}])
+    _, second, _ = update_preview_with_replacements(
+        first, [{"mask": mask, "replacement": "#00ff00"}])
+    assert second["matched_rgb"] is not first["matched_rgb"]
+    assert second["matched_rgb"][0, 0].tolist() == [0, 255, 0]
+    # A new mask object with identical content also recomputes (identity key)
+    _, third, _ = update_preview_with_replacements(
+        second, [{"mask": mask.copy(), "replacement": "#00ff00"}])
+    assert third["matched_rgb"] is not second["matched_rgb"]
+    np.testing.assert_array_equal(third["matched_rgb"], second["matched_rgb"])
+
+
+def test_click_calibration_cached_per_bed():
+    """Calibration is reused for the same bed and recomputed on a bed change."""
+    cache = {"target_w": 100, "target_h": 50, "target_width_mm": 60.0}
+    first = _click_calibration(cache, "256×256 mm")
+    assert _click_calibration(cache, "256×256 mm") is first
+    other = _click_calibration(cache, "180×180 mm")
+    assert other != first
+    assert cache["_click_calib"][0][0] == "180×180 mm"
+
+
+def test_preview_array_matches_preview_dict():
+    """ColorSystem.preview_array is a (N, 4) uint8 table built once per config."""
+    from config import ColorSystem
+
+    conf = dict(ColorSystem.SIX_COLOR)
+    arr = ColorSystem.preview_array(conf)
+    assert arr.dtype == np.uint8 and arr.shape == (len(conf["slots"]), 4)
+    for mid, rgba in conf["preview"].items():
+        assert arr[mid].tolist() == rgba
+    assert ColorSystem.preview_array(conf) is arr
+
+
+def test_backing_color_paints_backing_only_pixels():
+    from config import ColorSystem
+    from core.converter import update_preview_with_backing_color
+
+    material = np.zeros((2, 2, 5), dtype=np.int32)
+    material[0, 0] = -1
+    preview = np.zeros((2, 2, 4), dtype=np.uint8)
+    cache = {
+        "color_conf": ColorSystem.RYBW,
+        "material_matrix": material,
+        "mask_solid": np.ones((2, 2), dtype=bool),
+        "preview_rgba": preview,
+    }
+    out, _ = update_preview_with_backing_color(cache, 3)
+    assert out[0, 0].tolist() == [0, 100, 240, 255]
+    assert out[1, 1].tolist() == [0, 0, 0, 0]
+    assert not preview.any()
+
+
+def test_loop_refresh_without_loop_skips_loop_drawing():
+    """Plain refreshes never build the loop layer and leave the cache untouched."""
+    from unittest.mock import patch
+
+    from config import ColorSystem
+    from core.converter import update_preview_with_loop
+
+    preview = np.zeros((8, 8, 4), dtype=np.uint8)
+    preview[2:6, 2:6] = (10, 20, 30, 255)
+    snapshot = preview.copy()
+    cache = {"preview_rgba": preview, "color_conf": ColorSystem.RYBW}
+    with patch("core.converter._draw_loop_on_canvas") as draw_loop:
+        display = update_preview_with_loop(cache, (4, 4), False, 4, 8, 2.5, 0)
+    draw_loop.assert_not_called()
+    assert display.ndim == 3
+    np.testing.assert_array_equal(cache["preview_rgba"], snapshot)
+
+
+def test_warmup_preview_kernels_runs():
+    """Warm-up compiles every kernel (or reports numba missing) without error."""
+    from core.converter import HAS_NUMBA, warmup_preview_kernels
+
+    assert warmup_preview_kernels() is HAS_NUMBA
+
+
+def test_highlight_border_memoized_per_color():
+    """Re-highlighting the same color reuses the dilated border ring."""
+    from unittest.mock import patch
+
+    import cv2
+
+    from config import ColorSystem
+    from core.converter import generate_highlight_preview
+
+    matched = np.zeros((12, 12, 3), dtype=np.uint8)
+    matched[4:8, 4:8] = (255, 0, 0)
+    cache = {
+        "matched_rgb": matched,
+        "mask_solid": np.ones((12, 12), dtype=bool),
+        "color_conf": ColorSystem.RYBW,
+    }
+    with patch("core.converter.cv2.dilate", wraps=cv2.dilate) as dilate:
+        first, _ = generate_highlight_preview(cache, "#ff0000")
+        second, _ = generate_highlight_preview(cache, "#ff0000")
+        generate_highlight_preview(cache, "#000000")
+    assert dilate.call_count == 2
+    np.testing.assert_array_equal(first, second)
+
+    border = cache["highlight_border"][2][(0xff, "global")][1]
+    assert border[3, 4] and not border[5, 5]
+
+    # Replacing matched_rgb drops every memoized ring, not just the redrawn one
+    cache["matched_rgb"] = matched.copy()
+    with patch("core.converter.cv2.dilate", wraps=cv2.dilate) as dilate:
+        generate_highlight_preview(cache, "#ff0000")
+    assert dilate.call_count == 1
+    memo = cache["highlight_border"]
+    assert memo[0] is cache["matched_rgb"]
+    assert list(memo[2]) == [(0xff, "global")]
+
+
+def test_rgb_to_hex_list_matches_rgb_to_hex():
+    from core.converter import _rgb_to_hex, _rgb_to_hex_list
+
+    rgb = np.random.RandomState(0).randint(0, 256, (50, 3))
+    assert _rgb_to_hex_list(rgb) == [_rgb_to_hex(c) for c in rgb]
+    assert _rgb_to_hex_list(np.zeros((0, 3), dtype=np.uint8)) == []
+
+
+def test_detect_lut_color_mode_cached_until_file_changes(tmp_path):
+    from unittest.mock import patch
+
+    from core.converter import detect_lut_color_mode
+
+    path = str(tmp_path / "lut.npy")
+    np.save(path, np.zeros((32, 3), dtype=np.uint8))
+    with patch("core.converter.np.load", wraps=np.load) as load:
+        assert detect_lut_color_mode(path) == "BW (Black & White)"
+        assert detect_lut_color_mode(path) == "BW (Black & White)"
+    assert load.call_count <= 1
+
+    np.save(path, np.zeros((1296, 3), dtype=np.uint8))
+    assert detect_lut_color_mode(path) == "6-Color (Smart 1296)"
+
+
+def test_read_npy_shape_matches_np_load(tmp_path):
+    from core.converter import _read_npy_shape
+
+    path = str(tmp_path / "a.npy")
+    for arr in (np.zeros((2738, 3), np.uint8), np.zeros(99), np.zeros((34, 34, 3), np.float32)):
+        np.save(path, arr)
+        assert tuple(_read_npy_shape(path)) == np.load(path).shape
+
+
+def test_lut_mode_buckets_match_range_cascade():
+    from core.converter import _lut_mode_for_count
+
+    def cascade(t):
+        if 30 <= t <= 35:
+            return "BW (Black & White)"
+        if 2400 <= t < 2600:
+            return "5-Color Extended"
+        if 2600 <= t <= 2800:
+            return "8-Color Max"
+        if 1200 <= t < 1400:
+            return "6-Color (Smart 1296)"
+        if 900 <= t < 1200:
+            return "4-Color"
+        return None
+
+    for t in range(0, 3200):
+        assert _lut_mode_for_count(t) == cascade(t), t
+
+
+def test_card_grid_splits_near_2738_luts(tmp_path):
+    """Any 8-color-sized LUT gets the two-card layout; other sizes stay single."""
+    from core.converter import generate_lut_card_grid_html
+
+    for total, cards in ((2737, 2), (2738, 2), (2468, 1), (1024, 1)):
+        path = str(tmp_path / f"lut_{total}.npy")
+        np.save(path, np.zeros((total, 3), dtype=np.uint8))
+        html = generate_lut_card_grid_html(path, lang="en")
+        assert html.count("Card A") + html.count("-color Card") >= 1
+        assert ("Card B" in html) == (cards == 2), total
+
+
+def test_card_grid_dedupe_emits_each_color_once(tmp_path):
+    from core.converter import generate_lut_card_grid_html
+
+    colors = np.array([[1, 2, 3], [4, 5, 6], [1, 2, 3], [7, 8, 9], [4, 5, 6]], dtype=np.uint8)
+    path = str(tmp_path / "noisy.npy")
+    np.save(path, colors)
+
+    full = generate_lut_card_grid_html(path, lang="en")
+    deduped = generate_lut_card_grid_html(path, lang="en", dedupe=True)
+    assert full.count("data-color=") == 5
+    assert deduped.count("data-color=") == 3
+    # first-occurrence order is kept
+    order = [deduped.index(h) for h in ("#010203", "#040506", "#070809")]
+    assert order == sorted(order)
+
+
+def test_card_grid_html_memoized_until_file_changes(tmp_path):
+    from core.converter import _render_lut_card_grid_html_cached, generate_lut_card_grid_html
+
+    path = str(tmp_path / "card.npy")
+    np.save(path, np.zeros((4, 3), dtype=np.uint8))
+    first = generate_lut_card_grid_html(path, lang="en")
+    hits = _render_lut_card_grid_html_cached.cache_info().hits
+    assert generate_lut_card_grid_html(path, lang="en") is first
+    assert _render_lut_card_grid_html_cached.cache_info().hits == hits + 1
+
+    np.save(path, np.full((9, 3), 255, dtype=np.uint8))
+    changed = generate_lut_card_grid_html(path, lang="en")
+    assert "#ffffff" in changed and "#000000" not in changed
+
+
+def test_card_swatch_emitter_matches_template():
+    """Compiled byte emitter and %-format fallback produce identical markup."""
+    from unittest.mock import patch
+
+    from core.converter import _render_card_swatches
+
+    # every channel value (1-3 digit decimals, all hex nibbles) on each channel
+    v = np.arange(256, dtype=np.uint8)
+    rgb = np.stack([v, v[::-1], np.roll(v, 85)], axis=1)
+    rgb = np.vstack([rgb, [[0, 0, 0], [200, 30, 30], [30, 200, 30], [30, 30, 200]]])
+
+    html = _render_card_swatches(rgb)
+    with patch('core.converter._emit_card_swatches_numba', None):
+        expected = _render_card_swatches(rgb)
+    assert html == expected
+    assert html.count("data-color=") == len(rgb)
+    assert "data-color='#c81e1e' data-hue='red'" in html
+
+
+def test_debug_preview_contours_match_per_layer_masks(tmp_path, monkeypatch):
+    """Contours come from the same per-material masks as the per-layer OR loop."""
+    import cv2
+    from PIL import Image
+
+    import core.converter as converter
+
+    rng = np.random.RandomState(3)
+    mask_solid = rng.rand(24, 20) > 0.2
+    quantized = rng.randint(0, 256, size=(24, 20, 3)).astype(np.uint8)
+    # dense noise, and sparse patches that exercise the bounding-box crop
+    sparse = np.full((24, 20, 5), 5)
+    sparse[3:9, 12:18, 1] = 2
+    sparse[15:22, 2:6, 3] = 1
+    sparse[20:24, 16:20, 0] = 3
+    monkeypatch.setattr(converter, "OUTPUT_DIR", str(tmp_path))
+
+    for material_matrix in (rng.randint(-1, 6, size=(24, 20, 5)), sparse):
+        expected = quantized.copy()
+        for mat_id in range(4):
+            mat_mask = np.zeros(material_matrix.shape[:2], dtype=bool)
+            for layer in range(material_matrix.shape[2]):
+                mat_mask |= material_matrix[:, :, layer] == mat_id
+            mat_mask = (mat_mask & mask_solid).astype(np.uint8) * 255
+            contours, _ = cv2.findContours(mat_mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+            cv2.drawContours(expected, contours, -1, (0, 0, 0), 1)
+
+        converter._save_debug_preview(
+            {'quantized_image': quantized, 'num_colors': 8},
+            material_matrix, mask_solid, "img.png", "Test"
+        )
+        saved = np.array(Image.open(tmp_path / "img_Test_Debug.png"))
+        np.testing.assert_array_equal(saved, expected)
+
+
+def test_preview_mesh_downsample_mask_matches_astype_resize(monkeypatch):
+    """The view-based mask resize equals the uint8 astype round trip."""
+    import cv2
+
+    import core.converter as converter
+
+    captured = {}
+
+    def fake_build(mask_solid, matched_rgb, *args):
+        captured['mask'] = mask_solid.copy()
+        return np.empty((0, 3)), np.empty((0, 3), np.int64), np.empty((0, 4), np.uint8)
+
+    monkeypatch.setattr(converter, "_build_preview_voxel_arrays", fake_build)
+    rng = np.random.RandomState(9)
+    mask = rng.rand(1003, 701) > 0.3
+    rgb = rng.randint(0, 256, size=(1003, 701, 3)).astype(np.uint8)
+    assert converter._create_preview_mesh(rgb, mask, 10) is None
+
+    scale = captured['mask'].shape
+    expected = cv2.resize(mask.astype(np.uint8), scale[::-1], interpolation=cv2.INTER_NEAREST).astype(bool)
+    assert captured['mask'].dtype == np.bool_
+    np.testing.assert_array_equal(captured['mask'], expected)
+
+
+def test_processor_loaded_once_per_lut_version(tmp_path, monkeypatch):
+    import core.converter as converter
+
+    loads = []
+
+    class FakeProcessor:
+        def __init__(self, lut_path, color_mode):
+            loads.append((lut_path, color_mode))
+            self.lut_rgb = np.load(lut_path)
+            self.enable_cleanup = True
+
+    monkeypatch.setattr(converter, "LuminaImageProcessor", FakeProcessor)
+    converter._load_processor.cache_clear()
+
+    path = str(tmp_path / "lut.npy")
+    np.save(path, np.zeros((4, 3), dtype=np.uint8))
+    first = converter._get_processor(path, "4-Color")
+    first.enable_cleanup = False
+    second = converter._get_processor(path, "4-Color")
+    assert len(loads) == 1
+    assert second is not first and second.enable_cleanup is True
+    assert second.lut_rgb is first.lut_rgb
+
+    np.save(path, np.zeros((9, 3), dtype=np.uint8))
+    assert converter._get_processor(path, "4-Color").lut_rgb.shape == (9, 3)
+    assert len(loads) == 2
+    converter._load_processor.cache_clear()
+
+
+def test_loop_color_is_most_frequent_nonzero_material():
+    from core.converter import _calculate_loop_info
+
+    mask = np.ones((10, 10), dtype=bool)
+    mm = np.zeros((10, 10, 5), dtype=np.int64)
+    info = _calculate_loop_info((5, 5), 4, 8, 2, mask, mm, 10, 10, 1.0)
+    assert info['color_id'] == 0  # only white around the attach point
+
+    mm[..., 0] = 3
+    mm[4:7, 3:9, 1] = 2
+    mm[4:7, 3:9, 2] = 2
+    mm[4:7, 3:9, 3] = -1
+    info = _calculate_loop_info((5, 5), 4, 8, 2, mask, mm, 10, 10, 1.0)
+    assert info['color_id'] == 2
+
+    mm[..., 1:] = 1  # tie between 1 and 3 is broken by the lowest id
+    mm[..., 0] = 3
+    mm[..., 2:] = 0
+    assert _calculate_loop_info((5, 5), 4, 8, 2, mask, mm, 10, 10, 1.0)['color_id'] == 1
+
+
+def test_render_preview_does_not_touch_cached_bed_background():
+    from config import BedManager, ColorSystem
+    from core.converter import _bed_background, render_preview
+
+    bed_w, bed_h = BedManager.get_bed_size(BedManager.DEFAULT_BED)
+    empty = render_preview(None, None, 4, 8, 2, 0, False, ColorSystem.get("4-Color"))
+    before = np.array(_bed_background(bed_w, bed_h, True))
+    np.testing.assert_array_equal(empty, before)
+
+    rgba = np.full((20, 30, 4), 255, dtype=np.uint8)
+    with_model = render_preview(rgba, (5, 5), 4, 8, 2, 0, True, ColorSystem.get("4-Color"),
+                                target_width_mm=60)
+    assert not np.array_equal(with_model, before)
+    np.testing.assert_array_equal(np.array(_bed_background(bed_w, bed_h, True)), before)
+
+
+def test_draw_loop_on_preview_matches_imagedraw():
+    """Direct array painting equals the ImageDraw rectangle + ellipses."""
+    from PIL import Image, ImageDraw
+
+    from core.converter import _draw_loop_on_preview
+
+    conf = {'preview': {0: [255, 255, 255, 255], 1: [10, 200, 30, 255]}}
+    rng = np.random.RandomState(0)
+    # (attach_x_mm, attach_y_mm, width_mm, length_mm, hole_dia_mm); the last
+    # two cases hang off the top-left / bottom-right edges
+    for ax, ay, lw, ll, hd in ((6, 3, 4, 8, 2), (1, 19, 6, 9, 3), (28, 0, 5, 3, 1.5), (0, 2, 0.3, 0.2, 0)):
+        img = rng.randint(0, 256, size=(40, 60, 4)).astype(np.uint8)
+        info = {'attach_x_mm': ax, 'attach_y_mm': ay, 'width_mm': lw,
+                'length_mm': ll, 'hole_dia_mm': hd, 'color_id': 1}
+        pixel_scale = 0.5
+
+        pil = Image.fromarray(img.copy(), mode='RGBA')
+        draw = ImageDraw.Draw(pil)
+        col = int(ax / pixel_scale)
+        row = int(39 - ay / pixel_scale)
+        w_px, h_px = int(lw / pixel_scale), int(ll / pixel_scale)
+        r, hole_r = w_px // 2, int(hd / 2 / pixel_scale)
+        top = row - (h_px - r)
+        if h_px - r > 0:
+            draw.rectangle([col - w_px // 2, top, col + w_px // 2, row], fill=(10, 200, 30, 255))
+        draw.ellipse([col - r, top - r, col + r, top + r], fill=(10, 200, 30, 255))
+        draw.ellipse([col - hole_r, top - hole_r, col + hole_r, top + hole_r], fill=(0, 0, 0, 0))
+
+        out = _draw_loop_on_preview(img.copy(), info, conf, pixel_scale)
+        np.testing.assert_array_equal(out, np.array(pil))
+
+
+def test_background_export_joined_when_preview_fails(tmp_path, monkeypatch):
+    """A failing 3D preview still waits for the 3MF writer before raising."""
+    import threading
+    import time
+
+    import pytest
+    from PIL import Image
+
+    import core.converter as converter
+    from config import ModelingMode
+
+    finished = threading.Event()
+
+    def slow_export(**kwargs):
+        time.sleep(0.2)
+        finished.set()
+
+    def broken_preview(*args, **kwargs):
+        raise RuntimeError("preview boom")
+
+    monkeypatch.setattr(converter, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(converter, "export_scene_with_bambu_metadata", slow_export)
+    monkeypatch.setattr(converter, "_create_preview_mesh", broken_preview)
+    monkeypatch.setenv("LUMINA_COLOR_RECIPE_POLICY", "off")
+
+    image_path = str(tmp_path / "img.png")
+    Image.fromarray(np.full((16, 16, 3), 200, dtype=np.uint8)).save(image_path)
+    lut_path = os.path.join(_ROOT, "lut-npy预设", "Custom", "Bambulab&PLA&RYBW&红-黄-蓝-白.npy")
+
+    with pytest.raises(RuntimeError, match="preview boom"):
+        converter.convert_image_to_3d(
+            image_path=image_path, lut_path=lut_path, target_width_mm=8.0,
+            spacer_thick=1.2, structure_mode="Single-sided", auto_bg=False,
+            bg_tol=30, color_mode="4-Color", add_loop=False, loop_width=4,
+            loop_length=8, loop_hole=2.5, loop_pos=None,
+            modeling_mode=ModelingMode.PIXEL,
+        )
+    assert finished.is_set()
@@ -0,0 +1,197 @@
+"""Unit tests for extractor sampling and correction fast paths."""
+
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+# Add project root to path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from config import ColorSystem
+from core.extractor import (
+    _corner_style,
+    _draw_cross_markers,
+    _sample_grid,
+    apply_auto_white_balance,
+    apply_brightness_correction,
+    draw_corner_points,
+    generate_simulated_reference,
+    manual_fix_cell,
+    probe_lut_cell,
+    run_extraction,
+)
+
+
+def _sample_grid_reference(warped, grid_size, physical_grid, cells_to_extract,
+                           offset_x, offset_y, zoom, barrel):
+    """Per-cell loop the extractor used before vectorization."""
+    size = warped.shape[0]
+    extracted = np.zeros((grid_size, grid_size, 3), dtype=np.uint8)
+    centers = []
+    count = 0
+    for r in range(grid_size):
+        for c in range(grid_size):
+            if count >= cells_to_extract:
+                break
+            nx = (c + 1 + 0.5) / physical_grid * 2 - 1
+            ny = (r + 1 + 0.5) / physical_grid * 2 - 1
+            rad = np.sqrt(nx**2 + ny**2)
+            k = 1 + barrel * (rad**2)
+            dx, dy = nx * k * zoom, ny * k * zoom
+            cx = (dx + 1) / 2 * size + offset_x
+            cy = (dy + 1) / 2 * size + offset_y
+            if 0 <= cx < size and 0 <= cy < size:
+                x0, y0 = int(max(0, cx - 4)), int(max(0, cy - 4))
+                x1, y1 = int(min(size, cx + 4)), int(min(size, cy + 4))
+                extracted[r, c] = warped[y0:y1, x0:x1].mean(axis=(0, 1)).astype(int)
+                centers.append((cx, cy))
+            count += 1
+        if count >= cells_to_extract:
+            break
+    return extracted, centers
+
+
+def test_sample_grid_matches_per_cell_loop():
+    rng = np.random.default_rng(3)
+    warped = rng.integers(0, 256, (200, 200, 3), dtype=np.uint8)
+    cases = [
+        (32, 34, 32 * 32, 0.0, 0.0, 1.0, 0.0),
+        (6, 8, 32, 3.0, -2.0, 1.0, 0.0),
+        # Offsets/zoom push edge cells out of bounds and clip others
+        (37, 39, 37 * 37, 12.5, -7.25, 1.08, 0.15),
+        (19, 21, 19 * 19, -30.0, 40.0, 0.9, -0.2),
+    ]
+    for case in cases:
+        got, got_centers = _sample_grid(warped, *case)
+        want, want_centers = _sample_grid_reference(warped, *case)
+        np.testing.assert_array_equal(got, want)
+        np.testing.assert_array_equal(got_centers, np.array(want_centers).reshape(-1, 2))
+
+
+def test_simulated_reference_matches_digit_loop():
+    colors = {0: np.array([250, 250, 250]), 1: np.array([220, 20, 60]),
+              2: np.array([255, 230, 0]), 3: np.array([0, 100, 240])}
+    want = np.zeros((32, 32, 3), dtype=np.uint8)
+    for i in range(1024):
+        stack = [(i // 4 ** d) % 4 for d in range(5)][::-1]
+        want[i // 32, i % 32] = (sum(colors[m] for m in stack) / 5.0).astype(np.uint8)
+    want = cv2.resize(want, (512, 512), interpolation=cv2.INTER_NEAREST)
+    np.testing.assert_array_equal(generate_simulated_reference(), want)
+
+
+def _brightness_reference(img):
+    """Row-by-row vignette correction the extractor used before broadcasting."""
+    h, w, _ = img.shape
+    l, a, b = cv2.split(cv2.cvtColor(img, cv2.COLOR_RGB2LAB))
+    m = 50
+    tl, tr = l[0:m, 0:m].mean(), l[0:m, w-m:w].mean()
+    bl, br = l[h-m:h, 0:m].mean(), l[h-m:h, w-m:w].mean()
+    top, bot = np.linspace(tl, tr, w), np.linspace(bl, br, w)
+    mask = np.array([top * (1 - y/h) + bot * (y/h) for y in range(h)])
+    target = (tl + tr + bl + br) / 4.0
+    l_new = np.clip(l.astype(float) * (target / (mask + 1e-5)), 0, 255).astype(np.uint8)
+    return cv2.cvtColor(cv2.merge([l_new, a, b]), cv2.COLOR_LAB2RGB)
+
+
+def test_brightness_correction_matches_row_loop():
+    rng = np.random.default_rng(5)
+    for shape in [(240, 320, 3), (157, 203, 3)]:
+        img = rng.integers(0, 256, shape, dtype=np.uint8)
+        np.testing.assert_array_equal(apply_brightness_correction(img), _brightness_reference(img))
+
+
+def test_white_balance_table_matches_float_gain():
+    rng = np.random.default_rng(6)
+    img = rng.integers(0, 256, (180, 260, 3), dtype=np.uint8)
+    img[:50, :50] = (200, 180, 150)  # dim corners so gains exceed 1 and saturate
+    h, w, _ = img.shape
+    corners = [img[0:50, 0:50], img[0:50, w-50:w], img[h-50:h, 0:50], img[h-50:h, w-50:w]]
+    gain = np.array([255, 255, 255]) / (sum(c.mean(axis=(0, 1)) for c in corners) / 4.0 + 1e-5)
+    want = np.clip(img.astype(float) * gain, 0, 255).astype(np.uint8)
+    np.testing.assert_array_equal(apply_auto_white_balance(img), want)
+
+
+def test_cross_markers_match_draw_marker():
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    # Include centers whose arms clip at every border
+    centers = np.array([[0.0, 0.0], [79.9, 59.5], [2.7, 30.2], [40.0, 1.0],
+                        [77.0, 58.0], [33.3, 44.8]])
+    want = base.copy()
+    for cx, cy in centers:
+        cv2.drawMarker(want, (int(cx), int(cy)), (0, 255, 0), cv2.MARKER_CROSS, 8, 1)
+    got = _draw_cross_markers(base.copy(), centers, (0, 255, 0))
+    np.testing.assert_array_equal(got, want)
+
+
+def test_manual_fix_reuses_cached_lut_and_keeps_edits(tmp_path):
+    path = str(tmp_path / "lut.npy")
+    np.save(path, np.zeros((4, 4, 3), dtype=np.uint8))
+
+    real_load = np.load
+    with patch("core.extractor.np.load", side_effect=real_load) as load:
+        preview, _ = manual_fix_cell((0, 1), "#ff0000", path)
+        assert preview is not None
+        manual_fix_cell((2, 3), "rgb(0, 0, 255)", path)
+        assert load.call_count == 1
+
+    lut = np.load(path)
+    assert lut[0, 1].tolist() == [255, 0, 0]
+    assert lut[2, 3].tolist() == [0, 0, 255]
+
+    # An external rewrite of the file invalidates the cached copy
+    np.save(path, np.full((4, 4, 3), 9, dtype=np.uint8))
+    os.utime(path, ns=(0, 1))
+    manual_fix_cell((0, 0), "#010203", path)
+    lut = np.load(path)
+    assert lut[0, 0].tolist() == [1, 2, 3]
+    assert lut[3, 3].tolist() == [9, 9, 9]
+
+
+def test_probe_reads_cached_lut_after_fix(tmp_path):
+    path = str(tmp_path / "lut.npy")
+    np.save(path, np.zeros((4, 4, 3), dtype=np.uint8))
+    manual_fix_cell((1, 2), "#123456", path)
+
+    with patch("core.extractor.np.load") as load:
+        # 512px preview of a 4x4 LUT: 128px per cell
+        _, hex_c, coord = probe_lut_cell(path, SimpleNamespace(index=(300, 200)))
+        load.assert_not_called()
+    assert coord == (1, 2)
+    assert hex_c == "#123456"
+
+
+def test_corner_style_resolved_once_per_mode():
+    _corner_style.cache_clear()
+    img = np.zeros((120, 160, 3), dtype=np.uint8)
+    pts = [[10, 10], [150, 10], [150, 110], [10, 110]]
+    with patch("core.extractor.ColorSystem.get", wraps=ColorSystem.get) as get:
+        first = draw_corner_points(img, pts, "5-Color Extended", "Page 2")
+        second = draw_corner_points(img, pts, "5-Color Extended", "Page 2")
+        assert get.call_count == 1
+    np.testing.assert_array_equal(first, second)
+    colors, labels = _corner_style("5-Color Extended", True)
+    assert colors[0] == (240, 100, 0)
+    assert labels[0] == "蓝色 (左上)"
+
+
+def test_extraction_refreshes_cached_lut_with_coarse_mtime(tmp_path):
+    path = str(tmp_path / "lumina_lut.npy")
+    np.save(path, np.zeros((32, 32, 3), dtype=np.uint8))
+    manual_fix_cell((0, 0), "#000000", path)  # primes the cache
+    stat = os.stat(path)
+
+    img = np.full((400, 400, 3), (10, 200, 30), dtype=np.uint8)
+    pts = [[20, 20], [380, 20], [380, 380], [20, 380]]
+    with patch("core.extractor.LUT_FILE_PATH", path):
+        run_extraction(img, pts, 0, 0, 1.0, 0.0, False, False, "4-Color")
+    # Same size and, on a coarse-mtime filesystem, the same timestamp
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    _, hex_c, _ = probe_lut_cell(path, SimpleNamespace(index=(8, 8)))
+    assert hex_c == "#0ac81e"
@@ -58,6 +58,17 @@ class TestGrayscaleMapping:
         expected = max_height - (128.0 / 255.0) * (max_height - base_thickness)
         np.testing.assert_allclose(result, expected, atol=1e-4)
 
+    def test_lookup_table_matches_float32_formula(self):
+        """uint8 查找表路径与逐像素 float32 公式逐位一致"""
+        grayscale = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        max_height, base_thickness = 2.4, 0.8
+
+        result = HeightmapLoader._map_grayscale_to_height(grayscale, max_height, base_thickness)
+
+        expected = max_height - (grayscale.astype(np.float32) / 255.0) * (max_height - base_thickness)
+        assert result.dtype == np.float32
+        np.testing.assert_array_equal(result, expected.astype(np.float32))
+
 
 # ========== 9.2 彩色图转灰度 (需求 1.2) ==========
 
@@ -93,6 +104,14 @@ class TestColorToGrayscale:
         assert result.dtype == np.uint8
         assert np.mean(result) > 0
 
+    def test_rgba_single_step_matches_bgr_hop(self):
+        """RGBA 单步转灰度与 RGBA → BGR → 灰度 结果逐位一致"""
+        rgba_image = np.random.default_rng(0).integers(0, 256, (37, 53, 4), dtype=np.uint8)
+        bgr = cv2.cvtColor(rgba_image, cv2.COLOR_RGBA2BGR)
+        expected = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+
+        np.testing.assert_array_equal(HeightmapLoader._to_grayscale(rgba_image), expected)
+
     def test_grayscale_image_passthrough(self):
         """验证灰度图直接返回"""
         gray_image = np.full((10, 10), 128, dtype=np.uint8)
@@ -208,6 +227,22 @@ class TestErrorHandling:
         assert result['success'] is False
         assert result['error'] is not None
 
+    def test_ascii_and_non_ascii_paths_decode_identically(self):
+        """ASCII 路径走 cv2.imread，中文路径走 imdecode，两者结果一致"""
+        image = np.random.default_rng(0).integers(0, 256, (24, 32, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ascii_path = os.path.join(tmp_dir, 'height.png')
+            cjk_path = os.path.join(tmp_dir, '高度图.png')
+            cv2.imwrite(ascii_path, image)
+            with open(ascii_path, 'rb') as src, open(cjk_path, 'wb') as dst:
+                dst.write(src.read())
+
+            ascii_result = HeightmapLoader.load_and_validate(ascii_path)
+            cjk_result = HeightmapLoader.load_and_validate(cjk_path)
+
+        assert ascii_result['success'] and cjk_result['success']
+        np.testing.assert_array_equal(ascii_result['grayscale'], cjk_result['grayscale'])
+
     def test_aspect_ratio_deviation_warning(self):
         """验证宽高比偏差超过 20% 时返回警告 (需求 8.2)"""
         warning = HeightmapLoader._check_aspect_ratio(100, 50, 100, 100)
@@ -233,3 +268,16 @@ class TestErrorHandling:
         grayscale[5:, :] = 255
         warning = HeightmapLoader._check_contrast(grayscale)
         assert warning is None
+
+    def test_process_stats_match_numpy(self):
+        """load_and_process 的 min/max/avg 统计与 NumPy 计算一致"""
+        image = np.random.default_rng(1).integers(0, 256, (40, 60), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'height.png')
+            cv2.imwrite(path, image)
+            result = HeightmapLoader.load_and_process(path, 60, 40, 5.0, 1.0)
+
+        height = result['height_matrix']
+        assert result['stats']['min_mm'] == float(np.min(height))
+        assert result['stats']['max_mm'] == float(np.max(height))
+        assert abs(result['stats']['avg_mm'] - float(np.mean(height))) < 1e-5
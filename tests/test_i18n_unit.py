@@ -0,0 +1,48 @@
+"""Unit tests for I18n lookups."""
+
+import os
+import sys
+
+# Add project root to path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+import pytest
+
+from core.i18n import I18n
+
+
+def _nested_get(key, lang):
+    """Two-level lookup I18n.get used before the flattened tables."""
+    if key in I18n.TEXTS:
+        return I18n.TEXTS[key].get(lang, I18n.TEXTS[key].get('zh', key))
+    return key
+
+
+def test_get_matches_nested_lookup():
+    for key in list(I18n.TEXTS) + ['missing_key']:
+        for lang in ('zh', 'en', 'fr'):
+            assert I18n.get(key, lang) == _nested_get(key, lang)
+
+
+def test_get_all_matches_get():
+    for lang in ('zh', 'en'):
+        all_texts = I18n.get_all(lang)
+        assert list(all_texts) == list(I18n.TEXTS)
+        assert all(all_texts[k] == I18n.get(k, lang) for k in I18n.TEXTS)
+        with pytest.raises(TypeError):
+            all_texts['app_title'] = 'changed'
+
+
+def test_update_is_visible_to_get():
+    key = '_test_runtime_key'
+    try:
+        I18n.update({key: {'zh': '测试', 'en': 'Test'}})
+        assert I18n.get(key, 'zh') == '测试'
+        assert I18n.get(key, 'en') == 'Test'
+        I18n.update({key: {'zh': '改'}})
+        assert I18n.get(key, 'en') == '改'
+    finally:
+        I18n.TEXTS.pop(key, None)
+        I18n._rebuild()
+    assert I18n.get(key, 'en') == key
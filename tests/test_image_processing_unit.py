@@ -0,0 +1,110 @@
+"""Unit tests for LuminaImageProcessor color-matching helpers."""
+
+import os
+import sys
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from PIL import Image
+from scipy.spatial import KDTree
+
+# Add project root to path
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+
+from config import ModelingMode, PrinterConfig
+from core import image_processing
+from core.image_processing import LuminaImageProcessor
+
+
+def _two_hop_lab(rgb_3d):
+    bgr = cv2.cvtColor(rgb_3d.astype(np.uint8), cv2.COLOR_RGB2BGR)
+    return cv2.cvtColor(bgr, cv2.COLOR_BGR2Lab).astype(np.float64)
+
+
+def test_rgb_to_lab_matches_bgr_hop_for_flat_and_image_input():
+    rng = np.random.default_rng(0)
+    flat = rng.integers(0, 256, (500, 3), dtype=np.uint8)
+    image = rng.integers(0, 256, (20, 30, 3), dtype=np.uint8)
+
+    flat_lab = LuminaImageProcessor._rgb_to_lab(flat)
+    assert flat_lab.shape == (500, 3) and flat_lab.dtype == np.float64
+    np.testing.assert_array_equal(flat_lab, _two_hop_lab(flat.reshape(1, -1, 3)).reshape(-1, 3))
+
+    np.testing.assert_array_equal(LuminaImageProcessor._rgb_to_lab(image), _two_hop_lab(image))
+    # Non-uint8 input is still cast first
+    np.testing.assert_array_equal(
+        LuminaImageProcessor._rgb_to_lab(flat.astype(np.int64)), flat_lab
+    )
+
+
+def test_pixel_mode_picks_nearest_lut_color_in_lab():
+    rng = np.random.default_rng(1)
+    processor = object.__new__(LuminaImageProcessor)
+    processor.lut_rgb = rng.integers(0, 256, (64, 3), dtype=np.uint8)
+    processor.ref_stacks = rng.integers(0, 4, (64, 5))
+    processor.layer_count = 5
+    processor.lut_lab = LuminaImageProcessor._rgb_to_lab(processor.lut_rgb)
+    processor.kdtree = KDTree(processor.lut_lab)
+
+    image = rng.integers(0, 256, (12, 17, 3), dtype=np.uint8)
+    matched_rgb, material_matrix, _ = processor._process_pixel_mode(image, 12, 17)
+
+    pixel_lab = LuminaImageProcessor._rgb_to_lab(image.reshape(-1, 3))
+    dist = ((pixel_lab[:, None, :] - processor.lut_lab[None]) ** 2).sum(axis=2)
+    chosen = ((pixel_lab - LuminaImageProcessor._rgb_to_lab(matched_rgb.reshape(-1, 3))) ** 2).sum(axis=1)
+    np.testing.assert_array_equal(chosen, dist.min(axis=1))
+    assert material_matrix.shape == (12, 17, 5)
+
+
+def test_pixel_mode_unique_color_query_matches_per_pixel_query():
+    rng = np.random.default_rng(2)
+    processor = object.__new__(LuminaImageProcessor)
+    processor.lut_rgb = rng.integers(0, 256, (32, 3), dtype=np.uint8)
+    processor.ref_stacks = rng.integers(0, 4, (32, 5))
+    processor.layer_count = 5
+    processor.lut_lab = LuminaImageProcessor._rgb_to_lab(processor.lut_rgb)
+    processor.kdtree = KDTree(processor.lut_lab)
+
+    # Pixel-art style input: few colors repeated over many pixels
+    palette = rng.integers(0, 256, (7, 3), dtype=np.uint8)
+    image = palette[rng.integers(0, 7, (30, 40))]
+    matched_rgb, material_matrix, _ = processor._process_pixel_mode(image, 30, 40)
+
+    _, want = processor.kdtree.query(LuminaImageProcessor._rgb_to_lab(image.reshape(-1, 3)))
+    np.testing.assert_array_equal(matched_rgb, processor.lut_rgb[want].reshape(30, 40, 3))
+    np.testing.assert_array_equal(material_matrix, processor.ref_stacks[want].reshape(30, 40, 5))
+
+
+def test_process_image_opens_bitmap_once_and_keeps_palette_transparency(tmp_path):
+    rng = np.random.default_rng(3)
+    processor = object.__new__(LuminaImageProcessor)
+    processor.lut_rgb = rng.integers(0, 256, (16, 3), dtype=np.uint8)
+    processor.ref_stacks = rng.integers(0, 4, (16, 5))
+    processor.layer_count = 5
+    processor.lut_lab = LuminaImageProcessor._rgb_to_lab(processor.lut_rgb)
+    processor.kdtree = KDTree(processor.lut_lab)
+    processor.enable_cleanup = False
+
+    # Palette image whose index 0 is transparent: left half see-through
+    indices = np.ones((20, 20), dtype=np.uint8)
+    indices[:, :10] = 0
+    img = Image.fromarray(indices, mode='P')
+    img.putpalette([0, 0, 0, 200, 50, 50] + [0] * 762)
+    path = str(tmp_path / "palette.png")
+    img.save(path, transparency=0)
+
+    real_open = Image.open
+    with patch.object(image_processing.Image, "open", side_effect=real_open) as opener:
+        # Pixel mode samples one pixel per nozzle width: 20 px wide output
+        width_mm = PrinterConfig.NOZZLE_WIDTH * 20 + 1e-6
+        result = processor.process_image(path, width_mm, ModelingMode.PIXEL, 8, False, 40, 0, 0)
+        assert opener.call_count == 1
+
+    w, h = result['dimensions']
+    assert (w, h) == (20, 20)
+    mask_solid = result['mask_solid']
+    assert mask_solid.shape == (h, w)
+    assert not mask_solid[:, :10].any()
+    assert mask_solid[:, 10:].all()
@@ -88,7 +88,7 @@ SUPPORTED_IMAGE_FILE_TYPES: list[str] = [
 
 # Runtime-injected i18n keys (avoids editing core/i18n.py).
 if hasattr(I18n, 'TEXTS'):
-    I18n.TEXTS.update({
+    I18n.update({
         'conv_advanced': {'zh': '🛠️ 高级设置', 'en': '🛠️ Advanced Settings'},
         'conv_stop':     {'zh': '🛑 停止生成', 'en': '🛑 Stop Generation'},
         'conv_batch_mode':      {'zh': '📦 批量模式', 'en': '📦 Batch Mode'},
@@ -260,31 +260,7 @@ def generate_lut_color_grid_html(colors: List[dict], selected_color: str = None,
 
     html_parts.append('<div id="lut-color-grid-container" style="max-height:400px; overflow-y:auto; padding:4px;">')
 
-    def _classify_hue(r, g, b):
-        """Classify RGB color into hue category."""
-        import colorsys
-        rf, gf, bf = r / 255.0, g / 255.0, b / 255.0
-        h, s, v = colorsys.rgb_to_hsv(rf, gf, bf)
-        h360 = h * 360
-        # Neutral: low saturation or very dark/light
-        if s < 0.15 or v < 0.10:
-            return 'neutral'
-        # Hue ranges
-        if h360 < 15 or h360 >= 345:
-            return 'red'
-        elif h360 < 40:
-            return 'orange'
-        elif h360 < 70:
-            return 'yellow'
-        elif h360 < 160:
-            return 'green'
-        elif h360 < 195:
-            return 'cyan'
-        elif h360 < 260:
-            return 'blue'
-        elif h360 < 345:
-            return 'purple'
-        return 'neutral'
+    from core.converter import _classify_hues
 
     def render_color_grid(color_list, section_title=None, section_color="#666"):
         """Helper to render a section of colors with data-hue attribute."""
@@ -293,10 +269,9 @@ def generate_lut_color_grid_html(colors: List[dict], selected_color: str = None,
             parts.append(f'<p style="color:{section_color}; font-size:11px; margin:8px 0 4px 0; font-weight:bold;">{section_title}</p>')
         parts.append('<div style="display:flex; flex-wrap:wrap; gap:8px; margin-bottom:12px;">')
 
-        for entry in color_list:
+        hue_cats = _classify_hues([entry['color'] for entry in color_list])
+        for entry, hue_cat in zip(color_list, hue_cats):
             hex_color = entry['hex']
-            r, g, b = entry['color']
-            hue_cat = _classify_hue(r, g, b)
 
             is_selected = selected_color and hex_color.lower() == selected_color.lower()
             outline_style = "outline: 3px solid #2196F3; outline-offset: 2px;" if is_selected else ""